@@ -1,8 +1,12 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.middleware.gzip import GZipMiddleware
+import base64
+import binascii
 import logging
 import os
 import secrets
+import zlib
 
 # Configure logger
 logging.basicConfig(
@@ -23,12 +27,18 @@ security = HTTPBasic()
 SUPERUSER_USERNAME = os.getenv("SUPERUSER_USERNAME", "admin")
 SUPERUSER_PASSWORD = os.getenv("SUPERUSER_PASSWORD", "admin")
 
+# Largest request body accepted once gzip-inflated
+MAX_INFLATED_BODY_BYTES = 64 * 1024 * 1024
+
+def credentials_match(username: str, password: str) -> bool:
+    """Constant-time comparison against the superuser credentials."""
+    correct_username = secrets.compare_digest(username.encode(), SUPERUSER_USERNAME.encode())
+    correct_password = secrets.compare_digest(password.encode(), SUPERUSER_PASSWORD.encode())
+    return correct_username and correct_password
+
 def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)):
     """Verify HTTP Basic Auth credentials against superuser credentials."""
-    correct_username = secrets.compare_digest(credentials.username, SUPERUSER_USERNAME)
-    correct_password = secrets.compare_digest(credentials.password, SUPERUSER_PASSWORD)
-    
-    if not (correct_username and correct_password):
+    if not credentials_match(credentials.username, credentials.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -43,6 +53,85 @@ app = FastAPI(
     dependencies=[Depends(verify_credentials)]  # Global authentication
 )
 
+def _basic_auth_ok(headers) -> bool:
+    """Whether the raw Authorization header carries the superuser's Basic credentials."""
+    scheme, _, encoded = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = base64.b64decode(encoded, validate=True).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    return credentials_match(username, password)
+
+async def _plain_response(send, status_code, text, headers=()):
+    await send({"type": "http.response.start", "status": status_code,
+                "headers": [(b"content-type", b"text/plain"), *headers]})
+    await send({"type": "http.response.body", "body": text.encode()})
+
+class GzipRequestMiddleware:
+    """Inflate gzip-encoded request bodies (large /upload-master-data posts) before routing.
+
+    Credentials are checked before anything is inflated, and the inflated size is
+    capped at MAX_INFLATED_BODY_BYTES.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers", [])) if scope["type"] == "http" else {}
+        if headers.get(b"content-encoding", b"").lower() != b"gzip":
+            await self.app(scope, receive, send)
+            return
+
+        if not _basic_auth_ok(headers):
+            await _plain_response(send, 401, "Invalid credentials", [(b"www-authenticate", b"Basic")])
+            return
+
+        # Inflate chunk by chunk, never producing more than the cap allows
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = bytearray()
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body += inflater.decompress(message.get("body", b""), MAX_INFLATED_BODY_BYTES + 1 - len(body))
+                if len(body) > MAX_INFLATED_BODY_BYTES:
+                    await _plain_response(send, 413, "Request body too large")
+                    return
+                more_body = message.get("more_body", False)
+            if not inflater.eof or inflater.unused_data:
+                raise zlib.error("truncated or trailing gzip data")
+        except zlib.error:
+            await _plain_response(send, 400, "Invalid gzip request body")
+            return
+        body = bytes(body)
+
+        scope = dict(scope)
+        scope["headers"] = [
+            (k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")
+        ] + [(b"content-length", str(len(body)).encode())]
+
+        body_sent = False
+
+        async def inflated_receive():
+            # The body once; after that, wait on the client (e.g. for http.disconnect)
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, inflated_receive, send)
+
+# Compress large JSON responses (e.g. /master-data); requests decompresses transparently
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Accept gzip-compressed request bodies from the frontend's bulk uploads
+app.add_middleware(GzipRequestMiddleware)
+
 # Register Routers
 app.include_router(orders_router, tags=["Orders"])
 app.include_router(sellers_router, tags=["Sellers"])
@@ -5,7 +5,7 @@ import csv
 import logging
 from typing import Optional
 from src.core.shopify_client import ShopifyClient
-from src.utils.utils import create_date_filter_query, order_to_csv_row
+from src.utils.utils import create_date_filter_query, order_to_csv_rows
 from src.utils.constants import SHOPIFY_ORDER_FIELDNAMES
 from src.utils.config import SHOPIFY_URL, HEADERS, TIMEZONE, DEFAULT_OUTPUT_FILENAME
 
@@ -55,8 +55,7 @@ class OrderExporter:
             
             # Fetch and write orders
             for order in self.client.fetch_orders(filter_query):
-                for line_item in order.line_items:
-                    row = order_to_csv_row(order, line_item)
+                for row in order_to_csv_rows(order):
                     writer.writerow(row)
                     total_count += 1
                 
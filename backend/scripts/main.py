@@ -4,9 +4,6 @@ Main script to export Shopify orders to CSV.
 import os
 import logging
 from src.utils.logger_config import setup_logging
-from scripts.exporter import fetch_and_export
-from src.core.auth import get_shopify_access_token
-from src.utils.config import ACCESS_TOKEN, SHOPIFY_SHOP_BASE_URL, update_access_token
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -14,6 +11,11 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main entry point for the application."""
+    # Imported here so the module itself loads without pandas/requests/Shopify stack
+    from scripts.exporter import fetch_and_export
+    from src.core.auth import get_shopify_access_token
+    from src.utils.config import ACCESS_TOKEN, SHOPIFY_SHOP_BASE_URL, update_access_token
+    
     # Setup logging
     setup_logging()
     # Check if access token is configured
@@ -13,7 +13,7 @@ class ActiveOrderStatuses(str, Enum):
     LAST_DAY = "LAST DAY"
 
 
-@dataclass
+@dataclass(slots=True)
 class ShippingAddress:
     """Represents a shipping address."""
     phone: Optional[str] = None
@@ -23,7 +23,7 @@ class ShippingAddress:
     zip: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LineItem:
     """Represents a line item in an order."""
     title: str
@@ -32,7 +32,7 @@ class LineItem:
     custom_attributes: Dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Represents a Shopify order."""
     id: str
@@ -70,19 +70,15 @@ class Order:
         customer_name = customer.get('displayName')
         
         # Parse line items
-        line_items = []
-        for li_edge in node['lineItems']['edges']:
-            item = li_edge['node']
-            custom_attrs = {
-                attr['key']: attr['value'] 
-                for attr in item['customAttributes']
-            }
-            line_items.append(LineItem(
+        line_items = [
+            LineItem(
                 title=item['title'],
                 sku=item.get('sku'),
                 quantity=item['quantity'],
-                custom_attributes=custom_attrs
-            ))
+                custom_attributes={attr['key']: attr['value'] for attr in item['customAttributes']}
+            )
+            for item in (li_edge['node'] for li_edge in node['lineItems']['edges'])
+        ]
         
         return cls(
             id=node['id'],
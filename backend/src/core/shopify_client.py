@@ -2,9 +2,13 @@
 Shopify API client for fetching orders.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import certifi
+import orjson
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Generator
 from src.core.models import Order
 from src.utils.constants import ORDERS_QUERY
@@ -14,6 +18,51 @@ from src.utils.config import HEADERS, API_DELAY_SECONDS
 logger = logging.getLogger(__name__)
 
 
+def _create_session() -> requests.Session:
+    """
+    HTTP session shared by all clients, so TLS connections to Shopify are kept
+    alive across pages and API calls. Headers (access token) are passed per request.
+    
+    The orders query is read-only, so POSTs are retried too: on 429 (honouring
+    Retry-After) and gateway errors, with backoff. When retries run out the last
+    response is returned and handled like any other failed page.
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _create_session()
+
+
+def _throttle_delay(payload: dict) -> float:
+    """
+    Seconds to wait before requesting the next page.
+    
+    Uses the GraphQL cost data Shopify returns with each page: no wait while
+    the bucket holds enough points for another page of the same requested
+    cost, otherwise just long enough for it to refill. Falls back to the
+    fixed API_DELAY_SECONDS when the response carries no throttle status.
+    
+    Args:
+        payload: Parsed GraphQL response
+    """
+    cost = (payload.get('extensions') or {}).get('cost') or {}
+    status = cost.get('throttleStatus')
+    if not status or not status.get('restoreRate'):
+        return API_DELAY_SECONDS
+    shortfall = cost.get('requestedQueryCost', 0) - status.get('currentlyAvailable', 0)
+    return max(shortfall, 0) / status['restoreRate']
+
+
 class ShopifyClient:
     """Client for interacting with Shopify GraphQL API."""
     
@@ -28,46 +77,84 @@ class ShopifyClient:
         self.url = url
         self.headers = headers
     
+    @staticmethod
+    def _body_prefix(filter_query: str) -> bytes:
+        """
+        JSON request body for the orders query up to the cursor value.
+        
+        The query text and filter are the same for every page, so they are
+        encoded once per fetch; each page only appends its cursor.
+        
+        Args:
+            filter_query: GraphQL filter query string
+        """
+        body = orjson.dumps({'query': ORDERS_QUERY, 'variables': {"query": filter_query, "cursor": None}})
+        return body[:-len(b'null}}')]
+    
+    def _post_page(self, body_prefix: bytes, cursor: Optional[str], delay: float = 0) -> requests.Response:
+        """
+        Request one page of orders.
+        
+        Args:
+            body_prefix: Encoded request body up to the cursor (see _body_prefix)
+            cursor: Cursor of the page to fetch (None for the first page)
+            delay: Seconds to wait before sending (rate limiting between pages)
+        """
+        if delay:
+            time.sleep(delay)
+        return _SESSION.post(
+            self.url,
+            data=body_prefix + orjson.dumps(cursor) + b'}}',
+            headers={"Content-Type": "application/json", **self.headers},
+            verify=certifi.where()
+        )
+    
     def fetch_orders(self, filter_query: str) -> Generator[Order, None, None]:
         """
         Fetch orders from Shopify API with pagination.
         
+        The cursor makes pages strictly sequential, but the next page is
+        requested in the background while the current one is parsed and
+        consumed, so at most one request is in flight at a time.
+        
         Args:
             filter_query: GraphQL filter query string
             
         Yields:
             Order instances
         """
-        has_next_page = True
-        cursor = None
-        
-        while has_next_page:
-            variables = {"cursor": cursor, "query": filter_query}
-            response = requests.post(
-                self.url,
-                json={'query': ORDERS_QUERY, 'variables': variables},
-                headers=self.headers,
-                verify=certifi.where()
-            )
-            
-            if response.status_code != 200:
-                error_msg = response.text
-                logger.error(f"API request failed: {error_msg}")
-                if response.status_code == 401 or "Invalid API key" in error_msg:
-                    raise PermissionError(f"Shopify authentication failed: {error_msg}")
-                break
-            
-            data = response.json().get('data', {}).get('orders', {})
-            
-            # Yield orders
-            for edge in data.get('edges', []):
-                order_node = edge['node']
-                yield Order.from_graphql_node(order_node)
-            
-            # Check for next page
-            page_info = data.get('pageInfo', {})
-            has_next_page = page_info.get('hasNextPage', False)
-            cursor = page_info.get('endCursor')
+        body_prefix = self._body_prefix(filter_query)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = executor.submit(self._post_page, body_prefix, None)
             
-            # Rate limiting
-            time.sleep(API_DELAY_SECONDS)
+            while pending is not None:
+                response = pending.result()
+                pending = None
+                
+                if response.status_code != 200:
+                    error_msg = response.text
+                    logger.error(f"API request failed: {error_msg}")
+                    if response.status_code == 401 or "Invalid API key" in error_msg:
+                        raise PermissionError(f"Shopify authentication failed: {error_msg}")
+                    break
+                
+                # Order pages with nested line items are large; orjson parses them much faster
+                payload = orjson.loads(response.content)
+                data = payload.get('data', {}).get('orders', {})
+                
+                # Check for next page and prefetch it (rate limiting: the
+                # delay runs in the worker, before the request is sent)
+                page_info = data.get('pageInfo', {})
+                if page_info.get('hasNextPage', False):
+                    pending = executor.submit(
+                        self._post_page, body_prefix, page_info.get('endCursor'), _throttle_delay(payload)
+                    )
+                
+                # Yield orders
+                for edge in data.get('edges', []):
+                    order_node = edge['node']
+                    yield Order.from_graphql_node(order_node)
+        finally:
+            # Consumer stopped early or a page failed: drop any queued prefetch
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,25 +1,61 @@
 import os
+import json
+import time
+import logging
+import tempfile
+import threading
 import googlemaps
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load variables from .env file
 load_dotenv()
 
-def get_city_from_address(address_string):
-    # Retrieve the key from the environment
-    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
-    
-    if not api_key:
-        raise ValueError("API Key not found. Ensure GOOGLE_MAPS_API_KEY is set in your .env file or environment.")
+logger = logging.getLogger(__name__)
+
+# Geocoded cities by normalized address, reused across runs
+GEOCODE_CACHE_FILE = "data/geocode_cache.json"
+GEOCODE_CACHE_DAYS = 30
+# Requests run on a threadpool; serializes read-merge-write of the cache file
+_GEOCODE_CACHE_LOCK = threading.Lock()
+
+# Results that are not a city; never cached, so the address is tried again next time
+NO_RESULTS = "No results found."
+NO_CITY = "City/Locality not found in results."
+ERROR_PREFIX = "An error occurred"
+
+# One client (and its connection pool) shared by every lookup
+_gmaps_client = None
+_GMAPS_CLIENT_LOCK = threading.Lock()
+
+
+def _get_gmaps_client():
+    global _gmaps_client
+    with _GMAPS_CLIENT_LOCK:
+        if _gmaps_client is None:
+            # Retrieve the key from the environment
+            api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+
+            if not api_key:
+                raise ValueError("API Key not found. Ensure GOOGLE_MAPS_API_KEY is set in your .env file or environment.")
 
-    gmaps = googlemaps.Client(key=api_key)
+            _gmaps_client = googlemaps.Client(key=api_key)
+        return _gmaps_client
+
+
+def _is_city(result):
+    return result not in (NO_RESULTS, NO_CITY) and not result.startswith(ERROR_PREFIX)
+
+
+def get_city_from_address(address_string):
+    gmaps = _get_gmaps_client()
     
     try:
         # Geocode the address
         geocode_result = gmaps.geocode(address_string)
 
         if not geocode_result:
-            return "No results found."
+            return NO_RESULTS
 
         # Extract city (locality)
         components = geocode_result[0].get('address_components', [])
@@ -31,7 +67,74 @@ def get_city_from_address(address_string):
             return city
         else:
             city = next((c['long_name'] for c in components if 'locality' in c['types']), None)
-            return city if city else "City/Locality not found in results."
+            return city if city else NO_CITY
 
     except Exception as e:
-        return f"An error occurred: {e}"
+        return f"{ERROR_PREFIX}: {e}"
+
+
+def _normalize_address(address_string):
+    return " ".join(str(address_string).upper().split())
+
+
+def _load_geocode_cache():
+    try:
+        if os.path.exists(GEOCODE_CACHE_FILE):
+            with open(GEOCODE_CACHE_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        logger.warning(f"Failed to read geocode cache: {e}")
+    return {}
+
+
+def _save_geocode_cache(cache):
+    # Write to a temp file and swap it in, so readers never see a partial file
+    cache_dir = os.path.dirname(GEOCODE_CACHE_FILE) or "."
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=cache_dir, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            json.dump(cache, f)
+        os.replace(tmp_path, GEOCODE_CACHE_FILE)
+    except Exception as e:
+        logger.warning(f"Failed to save geocode cache: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_cities_from_addresses(address_strings, max_workers=10):
+    """
+    City for each address (dict keyed by the given strings).
+    Addresses geocoded in the last GEOCODE_CACHE_DAYS are answered from the cache file;
+    the rest are geocoded concurrently and added to it (only lookups that found a city are cached).
+    """
+    with _GEOCODE_CACHE_LOCK:
+        cache = _load_geocode_cache()
+    now = time.time()
+    max_age = GEOCODE_CACHE_DAYS * 86400
+
+    cities = {}
+    misses = []
+    for address in address_strings:
+        hit = cache.get(_normalize_address(address))
+        if hit and now - hit["cached_at"] < max_age:
+            cities[address] = hit["city"]
+        else:
+            misses.append(address)
+
+    if misses:
+        new_entries = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for address, city in zip(misses, executor.map(get_city_from_address, misses)):
+                cities[address] = city
+                if _is_city(city):
+                    new_entries[_normalize_address(address)] = {"city": city, "cached_at": now}
+        if new_entries:
+            # Merge into the current file so entries saved meanwhile by other requests are kept
+            with _GEOCODE_CACHE_LOCK:
+                cache = _load_geocode_cache()
+                cache.update(new_entries)
+                _save_geocode_cache(cache)
+
+    return cities
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+from functools import lru_cache
 
 # Column Labels for Master (A-BB, 54 columns total)
 # Based on User Request Step 430 and lookup alignments
@@ -15,6 +16,25 @@ MASTER_COLUMNS = [
     "City Mismatch"
 ]
 
+# Master positions 10-15 (K-P) filled from the SKU reference column of the same row
+SKU_LOOKUP_POSITIONS = {
+    10: "SELLER", 11: "DELIVERY", 12: "MEAL TYPE", 13: "MEAL PLAN", 14: "PRODUCT", 15: "LABEL"
+}
+SKU_REF_COLUMNS = list(SKU_LOOKUP_POSITIONS.values()) + ["DESCRIPTION"]
+
+@lru_cache(maxsize=1)
+def _load_sku_ref(ref_path: str, mtime: float) -> pd.DataFrame:
+    """
+    SKU reference indexed by stripped SKU (a repeated SKU keeps its last row), values str()-ed.
+    Cached per (path, mtime), so editing the CSV invalidates it. Callers must not mutate the result.
+    1-based: 2(SKU), 3(SELLER), 4(PRODUCT), 5(MEAL TYPE), 6(MEAL PLAN), 7(DELIVERY), 8(LABEL)
+    0-based: 1(SKU), 2(SELLER), 3(PRODUCT), 4(MEAL TYPE), 5(MEAL PLAN), 6(DELIVERY), 7(LABEL)
+    """
+    ref_data = pd.read_csv(ref_path)
+    ref_df = ref_data[SKU_REF_COLUMNS].apply(lambda col: col.map(str))
+    ref_df.index = ref_data['SKU'].astype(str).str.strip()
+    return ref_df[~ref_df.index.duplicated(keep='last')]
+
 def vlookup_sku(export_df: pd.DataFrame) -> pd.DataFrame:
     """
     1. Loads SKU Reference Data.
@@ -25,48 +45,27 @@ def vlookup_sku(export_df: pd.DataFrame) -> pd.DataFrame:
     master_df = pd.DataFrame(index=export_df.index, columns=MASTER_COLUMNS)
     master_df.fillna("", inplace=True)
 
-    # 2. Load SKU Reference Data
-    # 1-based: 2(SKU), 3(SELLER), 4(PRODUCT), 5(MEAL TYPE), 6(MEAL PLAN), 7(DELIVERY), 8(LABEL)
-    # 0-based: 1(SKU), 2(SELLER), 3(PRODUCT), 4(MEAL TYPE), 5(MEAL PLAN), 6(DELIVERY), 7(LABEL)
+    # 2. Load SKU Reference Data (parsed once per file version)
     ref_path = "data/sku-ref.csv"
-    ref_dict = {}
+    ref_df = pd.DataFrame(columns=SKU_REF_COLUMNS)
     if os.path.exists(ref_path):
         try:
-            ref_data = pd.read_csv(ref_path)
-            for _, row in ref_data.iterrows():
-                sku_key = str(row['SKU']).strip()
-                ref_dict[sku_key] = {
-                    "SELLER": str(row['SELLER']),
-                    "DELIVERY": str(row['DELIVERY']),
-                    "MEAL TYPE": str(row['MEAL TYPE']),
-                    "MEAL PLAN": str(row['MEAL PLAN']),
-                    "PRODUCT": str(row['PRODUCT']),
-                    "LABEL": str(row['LABEL']),
-                    "DESCRIPTION": str(row['DESCRIPTION'])
-                }
+            ref_df = _load_sku_ref(ref_path, os.path.getmtime(ref_path))
         except Exception as e:
             print(f"Error loading SKU ref: {e}")
 
-    # 3. Base Mapping from Export Data (A-J mapping)
-    for i in range(10):
-        if i < len(export_df.columns):
-            master_df.iloc[:, i] = export_df.iloc[:, i]
+    # 3. Base Mapping from Export Data (A-J mapping), as one block
+    n_base = min(10, len(export_df.columns))
+    master_df.iloc[:, :n_base] = export_df.iloc[:, :n_base].to_numpy()
             
     # 4. Perform Lookups and Fill 10-15 and DESCRIPTION
-    for idx, row in export_df.iterrows():
-        sku = str(row.iloc[9]).strip() if len(row) > 9 else ""
-        if sku in ref_dict:
-            m = ref_dict[sku]
-            master_df.iloc[master_df.index.get_loc(idx), 10] = m["SELLER"]
-            master_df.iloc[master_df.index.get_loc(idx), 11] = m["DELIVERY"]
-            master_df.iloc[master_df.index.get_loc(idx), 12] = m["MEAL TYPE"]
-            master_df.iloc[master_df.index.get_loc(idx), 13] = m["MEAL PLAN"]
-            master_df.iloc[master_df.index.get_loc(idx), 14] = m["PRODUCT"]
-            master_df.iloc[master_df.index.get_loc(idx), 15] = m["LABEL"]
-            
-            # Fill Description at its named position
-            if 'DESCRIPTION' in master_df.columns:
-                master_df.loc[idx, 'DESCRIPTION'] = m["DESCRIPTION"]
+    # One hash lookup per column over the SKU array; unknown SKUs stay blank
+    if len(export_df.columns) > 9:
+        skus = export_df.iloc[:, 9].astype(str).str.strip()
+        for pos, ref_col in SKU_LOOKUP_POSITIONS.items():
+            master_df.iloc[:, pos] = skus.map(ref_df[ref_col]).fillna("").to_numpy()
+        # Fill Description at its named position
+        master_df.loc[:, 'DESCRIPTION'] = skus.map(ref_df['DESCRIPTION']).fillna("").to_numpy()
 
     # 5. Fill remaining Master slots from Export data
     # Alignment:
@@ -100,125 +99,152 @@ def vlookup_sku(export_df: pd.DataFrame) -> pd.DataFrame:
         'Weekly (4 Days)': 4, 'Monthly (16 Days)': 16,
         'Weekly (3 Days)': 3, 'Monthly (12 Days)': 12
     }
-    # Use the looked-up "MEAL PLAN" (Index 13 in master)
-    def calc_days(plan):
-        val = str(plan).strip()
-        return x_mapping.get(val, "")
-    
-    master_df.iloc[:, 23] = master_df.iloc[:, 13].apply(calc_days)
+    # Use the looked-up "MEAL PLAN" (Index 13 in master); unknown plans get ""
+    # (object-dtype mapper so day counts stay ints rather than becoming floats)
+    plans = master_df.iloc[:, 13].astype(str).str.strip()
+    master_df.iloc[:, 23] = plans.map(pd.Series(x_mapping, dtype=object)).fillna("").to_numpy()
 
     # 7. Defaults for Hyphen/Zero columns
-    zero_indices = list(range(27, 48)) # END DATE through SKIP18
-    for idx in zero_indices: master_df.iloc[:, idx] = "0"
-    
-    hyphen_indices = [48, 49, 50] # SKIP19, 20, DELSAT
-    for idx in hyphen_indices: master_df.iloc[:, idx] = "-"
+    master_df.iloc[:, 27:48] = "0" # STATUS through SKIP20
+    master_df.iloc[:, 48:51] = "-" # DELSAT, DELSUN, TS NOTES
 
     return master_df
 
 
+# Placeholder cell values that count as blank (CLABL, SKIP holidays)
+BLANK_VALUES = ['0', '0.0', 'nan', 'None', '']
+
+def _parse_dates(values: pd.Series):
+    """
+    Parses each string on its own, as pd.to_datetime(value) would, in one vectorized call.
+    Returns (dates, failed): failed marks values pd.to_datetime would have raised on;
+    '', 'nan' and 'NaT' parse to NaT without failing.
+    """
+    dates = pd.to_datetime(values, errors='coerce', format='mixed')
+    failed = dates.isna() & ~values.str.lower().isin(['', 'nan', 'nat'])
+    return dates, failed
+
+
 def update_label(master_df: pd.DataFrame) -> pd.DataFrame:
     """
     Update LABEL column:
     If CLABL is not blank, use CLABL. Otherwise use PRODUCT CODE.
     """
-    def get_label(row):
-        # Using column names from MASTER_COLUMNS
-        clabel = str(row.get('CLABL', '')).strip()
-        # Check for meaningful content
-        if clabel and clabel not in ['0', '0.0', 'nan', 'None', '']:
-            return clabel
-        return row.get('PRODUCT CODE', '')
-        
-    master_df['LABEL'] = master_df.apply(get_label, axis=1)
+    clabel = master_df['CLABL'].astype(str).str.strip()
+    # Check for meaningful content
+    has_clabel = clabel.notna() & ~clabel.isin(BLANK_VALUES)
+    master_df['LABEL'] = np.where(has_clabel, clabel, master_df['PRODUCT CODE'])
     return master_df
 
-def fill_end_date(master_df: pd.DataFrame) -> pd.DataFrame:
+def _end_dates(master_df: pd.DataFrame):
     """
-    Calculates the END DATE based on DAYS, holidays (SKIPs), and weekends (DELSAT/DELSUN).
+    END DATE values from START DATE, DAYS, holidays (SKIPs) and weekends (DELSAT/DELSUN).
+    Returns positional Series (end_date, start_val, start_dt, start_failed, end_dt): the
+    END DATE strings plus the parsed dates behind them, so STATUS needs no second parse.
     """
     from pandas.tseries.offsets import CustomBusinessDay
 
-    def calculate_end_date_row(row):
-        start_val = str(row.get('START DATE', '')).strip()
-        days_val = row.get('DAYS', 0)
-        
-        if start_val == 'P':
-            return 'PAUSE'
-        if start_val == '-' or not start_val or start_val == '0':
-            return '-'
-            
-        try:
-            start_dt = pd.to_datetime(start_val)
-        except:
-            return start_val
-            
-        # Collect Holidays from SKIP1-SKIP20
-        holidays = []
-        for i in range(28, 48):
-            h_val = str(row.iloc[i]).strip()
-            if h_val and h_val not in ['0', '0.0', 'nan', 'None', '-']:
-                try: holidays.append(pd.to_datetime(h_val))
-                except: pass
-        
-        # Determine Weekmask
-        sat_delivery = str(row.iloc[48]).strip().lower() == "yes"
-        sun_delivery = str(row.iloc[49]).strip().lower() == "yes"
-        mask = [1, 1, 1, 1, 1, 1 if sat_delivery else 0, 1 if sun_delivery else 0]
-        
-        try:
-            num_days = int(float(days_val)) if days_val else 1
-            if num_days > 1:
-                cbd = CustomBusinessDay(holidays=holidays, weekmask=mask)
-                end_dt = start_dt + (num_days - 1) * cbd
-            else:
-                end_dt = start_dt
-            return end_dt.strftime("%Y-%m-%d")
-        except:
-            return start_dt.strftime("%Y-%m-%d")
+    # Work on positions so group results land on the right rows whatever the index
+    rows = master_df.reset_index(drop=True)
+    start_val = rows['START DATE'].astype(str).str.strip()
+    start_dt, start_failed = _parse_dates(start_val)
+
+    # Unparseable start dates are passed through as-is
+    end_date = start_val.copy()
+    end_date[start_val.isin(['-', '', '0'])] = '-'
+    end_date[start_val == 'P'] = 'PAUSE'
+    end_dt = pd.Series(pd.NaT, index=rows.index, dtype='datetime64[ns]')
+    dated = start_dt.notna() & ~start_val.isin(['P', '-', '', '0'])
+    if not dated.any():
+        return end_date, start_val, start_dt, start_failed, end_dt
+
+    # Business days to add: DAYS - 1 (none when DAYS is blank, <= 1 or not a number)
+    days = pd.to_numeric(rows['DAYS'], errors='coerce').replace([np.inf, -np.inf], np.nan)
+    steps = (np.trunc(days.fillna(1)) - 1).clip(lower=0).astype(int)
+
+    # Collect Holidays from SKIP1-SKIP20, as one sorted tuple per row
+    skips = rows.iloc[:, 28:48].astype(str).apply(lambda col: col.str.strip())
+    skips = skips.where(skips.notna() & ~skips.isin(BLANK_VALUES + ['-'])).stack().dropna()
+    holiday_dates, _ = _parse_dates(skips)
+    holiday_dates = holiday_dates.dropna()
+    holidays = pd.Series([()] * len(rows), dtype=object)
+    if not holiday_dates.empty:
+        per_row = holiday_dates.groupby(level=0).agg(lambda s: tuple(sorted(set(s))))
+        holidays[per_row.index] = per_row
+
+    # Determine Weekmask
+    sat_delivery = rows.iloc[:, 48].astype(str).str.strip().str.lower() == "yes"
+    sun_delivery = rows.iloc[:, 49].astype(str).str.strip().str.lower() == "yes"
+
+    # One CustomBusinessDay per (days, holidays, weekmask) group, applied per distinct start date
+    keys = pd.DataFrame({'steps': steps, 'holidays': holidays, 'sat': sat_delivery, 'sun': sun_delivery})[dated]
+    for (n_steps, hols, sat, sun), group in keys.groupby(['steps', 'holidays', 'sat', 'sun'], sort=False):
+        starts = start_dt[group.index]
+        if n_steps > 0:
+            mask = [1, 1, 1, 1, 1, 1 if sat else 0, 1 if sun else 0]
+            offset = n_steps * CustomBusinessDay(holidays=list(hols), weekmask=mask)
+            ends = {d: d + offset for d in starts.unique()}
+            starts = starts.map(ends)
+        end_dt[group.index] = starts.dt.normalize()
+        end_date[group.index] = starts.dt.strftime("%Y-%m-%d")
+
+    return end_date, start_val, start_dt, start_failed, end_dt
+
+def _statuses(start_val, start_dt, start_failed, end_val, end_dt, end_failed) -> np.ndarray:
+    """STATUS per row from START/END DATE strings, their parsed dates and parse failures."""
+    today = pd.Timestamp.now().normalize()
+    start_dt = start_dt.dt.normalize()
+    end_dt = end_dt.dt.normalize()
+
+    # First matching condition wins; NaT dates compare False and end up DELIVERED
+    return np.select(
+        [
+            (start_val == 'P') | (end_val == 'PAUSE'),
+            (start_val == '-') | (end_val == '-'),
+            start_failed | end_failed,
+            end_dt == today,
+            (start_dt <= today) & (today <= end_dt),
+            today < start_dt,
+        ],
+        ['PAUSE', 'CANCELLED', 'ERROR', 'LAST DAY', 'WIP', 'TBS'],
+        default='DELIVERED'
+    )
 
+def fill_end_date(master_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculates the END DATE based on DAYS, holidays (SKIPs), and weekends (DELSAT/DELSUN).
+    """
     if not master_df.empty:
-        master_df['END DATE'] = master_df.apply(calculate_end_date_row, axis=1)
+        end_date = _end_dates(master_df)[0]
+        master_df['END DATE'] = end_date.to_numpy()
     return master_df
 
 def fill_status(master_df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculates the STATUS based on today's date relative to START DATE and END DATE.
     """
-    today = pd.Timestamp.now().normalize()
-
-    def calculate_status_row(row):
-        start_val = str(row.get('START DATE', '')).strip()
-        end_val = str(row.get('END DATE', '')).strip()
-        
-        if start_val == 'P' or end_val == 'PAUSE':
-            return 'PAUSE'
-        if start_val == '-' or end_val == '-':
-            return 'CANCELLED'
-            
-        try:
-            start_dt = pd.to_datetime(start_val).normalize()
-            end_dt = pd.to_datetime(end_val).normalize()
-        except:
-            return "ERROR"
-            
-        if today == end_dt:
-            return "LAST DAY"
-        elif start_dt <= today <= end_dt:
-            return "WIP"
-        elif today < start_dt:
-            return "TBS"
-        else:
-            return "DELIVERED"
-
-    if not master_df.empty:
-        master_df['STATUS'] = master_df.apply(calculate_status_row, axis=1)
+    if master_df.empty:
+        return master_df
+
+    start_val = master_df['START DATE'].astype(str).str.strip()
+    end_val = master_df['END DATE'].astype(str).str.strip()
+    start_dt, start_failed = _parse_dates(start_val)
+    end_dt, end_failed = _parse_dates(end_val)
+    master_df['STATUS'] = _statuses(start_val, start_dt, start_failed, end_val, end_dt, end_failed)
     return master_df
 
 def create_master_transformations(export_df: pd.DataFrame) -> pd.DataFrame:
     master_df = vlookup_sku(export_df)
     master_df = update_label(master_df)
-    master_df = fill_end_date(master_df)
-    master_df = fill_status(master_df)
+    if master_df.empty:
+        return master_df
+
+    # END DATE and STATUS from one parse of START DATE (what fill_end_date then
+    # fill_status do, without re-parsing the END DATE strings just formatted).
+    # Rows without a computed end date are PAUSE/CANCELLED, or ERROR via their start date.
+    end_date, start_val, start_dt, start_failed, end_dt = _end_dates(master_df)
+    no_failures = np.zeros(len(end_date), dtype=bool)
+    master_df['END DATE'] = end_date.to_numpy()
+    master_df['STATUS'] = _statuses(start_val, start_dt, start_failed, end_date, end_dt, no_failures)
     
     return master_df
@@ -1,21 +1,31 @@
+import re
 import pandas as pd
 import numpy as np
-from src.processing.find_city import get_city_from_address
+from src.processing.find_city import get_cities_from_addresses
+
+DRIVER_INSTRUCTIONS_COL = 'Delivery Instructions (for drivers)'
+# The field label Shopify prefixes to the value, and line breaks
+DRIVER_INSTRUCTIONS_PATTERN = re.compile(re.escape(f'{DRIVER_INSTRUCTIONS_COL}:') + '|\n')
 
 def removeRowsWithBlankSKU(df: pd.DataFrame) -> pd.DataFrame:
-    df = df[df['SKU'].astype(str).str.strip() != '']
-    df = df[~df['SKU'].isin(['0'])]
-    return df
+    # Both conditions as one mask, so the frame is filtered (copied) once
+    sku = df['SKU']
+    return df[(sku.astype(str).str.strip() != '').to_numpy() & ~sku.isin(['0']).to_numpy()]
     
 def updateColumnDeliveryInstructionsforDrivers(df: pd.DataFrame) -> pd.DataFrame:
-    col = 'Delivery Instructions (for drivers)'
-    df[col] = df[col].astype(str).str.replace(f'{col}:', '', regex=False).str.replace('\n', '. ', regex=False)
+    col = DRIVER_INSTRUCTIONS_COL
+    # Drop the label and turn line breaks into '. ' in one pass over the column
+    df[col] = df[col].astype(str).str.replace(
+        DRIVER_INSTRUCTIONS_PATTERN, lambda m: '. ' if m.group(0) == '\n' else '', regex=True
+    )
     return df
 
 def moveDeliveryCitytoSelectDeliveryCity(df: pd.DataFrame) -> pd.DataFrame:
-    mask = df['Delivery city'].notna() & (df['Delivery city'].astype(str).str.strip() != '')
-    df.loc[mask, 'Select Delivery City'] = df.loc[mask, 'Delivery city']
-    df.loc[mask, 'Delivery city'] = ''
+    city = df['Delivery city']
+    mask = (city.notna() & (city.astype(str).str.strip() != '')).to_numpy()
+    # Whole-column assignments instead of two masked .loc reads/writes
+    df['Select Delivery City'] = city.where(mask, df['Select Delivery City'])
+    df['Delivery city'] = city.where(~mask, '')
     return df
 
 def fillZeros(df: pd.DataFrame) -> pd.DataFrame:
@@ -23,27 +33,30 @@ def fillZeros(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 def highlightMismatchedDeliveryCity(df: pd.DataFrame) -> pd.DataFrame:
-    df['City Mismatch'] = np.where(df['Select Delivery City'] != df['Shipping address city'], 'Incorrect City: ' + df['Shipping address city'].fillna(''), '')
+    shipping = df['Shipping address city'].fillna('').astype(str)
+    selected = df['Select Delivery City'].fillna('').astype(str)
+    # Surrounding spaces and casing alone don't make the cities differ
+    mismatch = (selected.str.strip().str.casefold() != shipping.str.strip().str.casefold()).to_numpy()
+    df['City Mismatch'] = np.where(mismatch, 'Incorrect City: ' + shipping, '')
     return df
 
 def findCity(df: pd.DataFrame) -> pd.DataFrame:
-    def get_row_city(row):
-        if row.get('City Mismatch') == 'Mismatch':
-            # Combine Address Line 1 and ZIP (Postal Code)
-            # Internal column names are all caps as defined in constants.py/utils.py
-            address = row.get('ADDRESS LINE 1', '')
-            zip_code = row.get('ZIP', '')
-            
-            if not address and not zip_code:
-                return "Address/ZIP missing"
-                
-            full_address = f"{address}, {zip_code}"
-            return get_city_from_address(full_address)
-        else:
-            # For rows without mismatch, copy Select Delivery City
-            return row.get('Select Delivery City', '')
-            
-    df['Delivery city'] = df.apply(get_row_city, axis=1)
+    # For rows without mismatch, copy Select Delivery City
+    city = df['Select Delivery City'].copy()
+    mismatch = (df['City Mismatch'] == 'Mismatch').to_numpy()
+    if mismatch.any():
+        # Combine Address Line 1 and ZIP (Postal Code)
+        # Internal column names are all caps as defined in constants.py/utils.py
+        address = df.loc[mismatch, 'ADDRESS LINE 1']
+        zip_code = df.loc[mismatch, 'ZIP']
+        missing = ~(address.map(bool) | zip_code.map(bool)).to_numpy()
+        full_address = address.astype(str) + ', ' + zip_code.astype(str)
+
+        # Each distinct address once: from the geocode cache, or geocoded concurrently
+        cities = get_cities_from_addresses(full_address[~missing].unique())
+        city[mismatch] = np.where(missing, "Address/ZIP missing", full_address.map(cities))
+
+    df['Delivery city'] = city
     return df
 
 def consolidateDeliveryTimes(df: pd.DataFrame) -> pd.DataFrame:
@@ -56,15 +69,14 @@ def consolidateDeliveryTimes(df: pd.DataFrame) -> pd.DataFrame:
         'Lunch Delivery Time', 'Lunch Time', 'Delivery between'
     ]
     
-    def get_first_valid(row):
-        for col in time_cols:
-            val = str(row.get(col, '0')).strip()
-            # If value is truthy and not just a zero-placeholder
-            if val and val not in ['0', '0.0', 'None', 'nan', '']:
-                return val
-        return ""
-        
-    df['deliverytime_edit'] = df.apply(get_first_valid, axis=1)
+    present = [col for col in time_cols if col in df.columns]
+    if not present:
+        df['deliverytime_edit'] = ''
+        return df
+    values = df[present].apply(lambda col: col.map(str).str.strip())
+    # Blank out zero-placeholders, then take the first remaining value per row
+    valid = values.mask(values.isin(['0', '0.0', 'None', 'nan', '']))
+    df['deliverytime_edit'] = valid.bfill(axis=1).iloc[:, 0].fillna('')
     return df
 
 def apply_all_transformations(df: pd.DataFrame) -> pd.DataFrame:
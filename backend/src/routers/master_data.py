@@ -1,14 +1,15 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+from itertools import groupby
 from datetime import datetime
 import re
 import logging
 
 from src.core.database import get_db_engine
-from src.schemas import MasterRowUpdate, SkipUpdate, MasterUploadRequest, MasterRowDelete
+from src.schemas import MasterRowUpdate, MasterRowsBulkUpdate, SkipUpdate, MasterUploadRequest, MasterRowDelete
 from src.utils.constants import SHOPIFY_ORDER_FIELDNAMES
 
 from src.core.models import ActiveOrderStatuses
@@ -21,16 +22,23 @@ def master_health():
     return {"status": "master router is reachable"}
 
 @router.get("/master-data")
-def get_all_master_data(table_name: str = "historical-data", only_active: bool = True):
+def get_all_master_data(table_name: str = "historical-data", only_active: bool = True, seller: Optional[str] = None, columnar: bool = False):
+    """Rows of a master table as a list of records, or as {"columns", "data"} when columnar=true."""
     engine, connector = get_db_engine()
     try:
         with engine.connect() as conn:
+            where_parts = []
+            params = {}
             if only_active:
                 # Active is defined as everything except DELIVERED or CANCELLED
-                query = f'SELECT * FROM "{table_name}" WHERE ("STATUS" NOT IN (\'DELIVERED\', \'CANCELLED\') OR "STATUS" IS NULL) ORDER BY "ORDER ID" ASC;'
-            else:
-                query = f'SELECT * FROM "{table_name}" ORDER BY "ORDER ID" ASC;'
-            df = pd.read_sql(query, engine)
+                where_parts.append('("STATUS" NOT IN (\'DELIVERED\', \'CANCELLED\') OR "STATUS" IS NULL)')
+            if seller:
+                # One seller's rows only, ignoring surrounding spaces in the stored code
+                where_parts.append('TRIM(CAST("SELLER" AS TEXT)) = :seller')
+                params["seller"] = seller.strip()
+            where_str = f' WHERE {" AND ".join(where_parts)}' if where_parts else ""
+            query = f'SELECT * FROM "{table_name}"{where_str} ORDER BY "ORDER ID" ASC;'
+            df = pd.read_sql(text(query), conn, params=params)
 
             # Clean dataframe for JSON serialization
             df = df.replace([np.inf, -np.inf], np.nan)
@@ -40,106 +48,122 @@ def get_all_master_data(table_name: str = "historical-data", only_active: bool =
             if "ORDER ID" in df.columns:
                 df["ORDER ID"] = df["ORDER ID"].astype(str)
 
+            if columnar:
+                # Column names once plus row lists; clients build the frame without per-row dicts
+                return {"columns": df.columns.tolist(), "data": df.values.tolist()}
             return df.to_dict(orient="records")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         connector.close()
-@router.get("/check-duplicate-ids")
-def check_duplicate_ids(table_name: str = "historical-data", order_ids: List[str] = Query(None)):
-    if not order_ids:
-        return {"existing_ids": []}
-    
+def find_existing_order_ids(conn, table_name, order_ids):
+    """Return the subset of order_ids (as passed in) that already exist in table_name."""
     # Normalize input IDs: trim and remove '#' for broad matching
     normalized_input = [str(oid).strip().replace("#", "") for oid in order_ids if oid]
     if not normalized_input:
+        return []
+
+    # We compare the input IDs against the DB IDs by removing '#' and trimming both sides
+    # This handles cases like "#30233" matching "30233"
+    ids_placeholder = ", ".join([f":id{i}" for i in range(len(normalized_input))])
+    params = {f"id{i}": oid for i, oid in enumerate(normalized_input)}
+    
+    # Query the table normalizing the ORDER ID column for the comparison
+    # But we want to return the ORIGINAL IDs that were passed in if they matched
+    query_sql = f"""
+        SELECT "ORDER ID" 
+        FROM "{table_name}" 
+        WHERE TRIM(REPLACE("ORDER ID", '#', '')) IN ({ids_placeholder})
+    """
+    result = conn.execute(text(query_sql), params).fetchall()
+    
+    # Now we need to map back which search IDs were found.
+    # We'll return a list of the input IDs that matched.
+    db_normalized_found = {str(r[0]).strip().replace("#", "") for r in result}
+    
+    found_original_ids = []
+    for original_id in order_ids:
+        if str(original_id).strip().replace("#", "") in db_normalized_found:
+            found_original_ids.append(original_id)
+    return found_original_ids
+
+@router.get("/check-duplicate-ids")
+def check_duplicate_ids(table_name: str = "historical-data", order_ids: List[str] = Query(None)):
+    if not order_ids:
         return {"existing_ids": []}
 
     engine, connector = get_db_engine()
     try:
         with engine.connect() as conn:
-            # We compare the input IDs against the DB IDs by removing '#' and trimming both sides
-            # This handles cases like "#30233" matching "30233"
-            ids_placeholder = ", ".join([f":id{i}" for i in range(len(normalized_input))])
-            params = {f"id{i}": oid for i, oid in enumerate(normalized_input)}
-            
-            # Query the table normalizing the ORDER ID column for the comparison
-            # But we want to return the ORIGINAL IDs that were passed in if they matched
-            query_sql = f"""
-                SELECT "ORDER ID" 
-                FROM "{table_name}" 
-                WHERE TRIM(REPLACE("ORDER ID", '#', '')) IN ({ids_placeholder})
-            """
-            result = conn.execute(text(query_sql), params).fetchall()
-            
-            # Now we need to map back which search IDs were found.
-            # We'll return a list of the input IDs that matched.
-            db_normalized_found = {str(r[0]).strip().replace("#", "") for r in result}
-            
-            found_original_ids = []
-            for original_id in order_ids:
-                if str(original_id).strip().replace("#", "") in db_normalized_found:
-                    found_original_ids.append(original_id)
-
-            return {"existing_ids": found_original_ids}
+            return {"existing_ids": find_existing_order_ids(conn, table_name, order_ids)}
     except Exception as e:
         logger.error(f"Error checking duplicate IDs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         connector.close()
 
+def build_row_update(table_name, order_id, updates, original_row):
+    """Build the UPDATE for one row, pinned to its original values.
+
+    Returns (sql, params), or None when there is nothing to update.
+    """
+    # Filter out empty keys from updates
+    valid_updates = {k: v for k, v in updates.items() if k and k != "ORDER ID"}
+    if not valid_updates:
+        return None
+
+    # Build SET clause
+    set_parts = []
+    params = {}
+    
+    for k, v in valid_updates.items():
+        col_key = f"val_{k.replace(' ', '_')}"
+        set_parts.append(f'"{k}" = :{col_key}')
+        params[col_key] = v
+    
+    set_str = ", ".join(set_parts)
+    
+    # Build WHERE clause using original_row fingerprint
+    where_parts = []
+    
+    # Always include ORDER ID
+    where_parts.append('"ORDER ID" = :oid')
+    params["oid"] = order_id
+    
+    # Include all other original fields to ensure uniqueness
+    for k, v in original_row.items():
+        # Skip ORDER ID since we added it specifically
+        # Skip columns that are being updated (use their ORIGINAL value for the check)
+        if k == "ORDER ID":
+            continue
+            
+        # We interpret empty strings/None as needing IS NULL checks or equality to empty string
+        # Ideally, we just check equality.
+        # Note: valid_updates keys shouldn't be used here, we use original_row values
+        
+        param_key = f"cond_{re.sub(r'[^a-zA-Z0-9_]', '_', k.strip())}"
+        
+        if v is None or str(v).lower() in ["nan", "none", ""]:
+            where_parts.append(f'(CAST("{k}" AS TEXT) IS NULL OR CAST("{k}" AS TEXT) = \'\' OR CAST("{k}" AS TEXT) = \'nan\')')
+        else:
+            where_parts.append(f'CAST("{k}" AS TEXT) = :{param_key}')
+            params[param_key] = str(v)
+
+    where_str = " AND ".join(where_parts)
+    
+    return text(f'UPDATE "{table_name}" SET {set_str} WHERE {where_str}'), params
+
 @router.post("/update-master-row")
 def update_master_row(update: MasterRowUpdate):
     table_name = update.table_name
     engine, connector = get_db_engine()
     try:
         with engine.connect() as conn:
-            # Filter out empty keys from updates
-            valid_updates = {k: v for k, v in update.updates.items() if k and k != "ORDER ID"}
-            if not valid_updates:
+            stmt = build_row_update(table_name, update.order_id, update.updates, update.original_row)
+            if stmt is None:
                 return {"status": "no changes"}
 
-            # Build SET clause
-            set_parts = []
-            params = {}
-            
-            for k, v in valid_updates.items():
-                col_key = f"val_{k.replace(' ', '_')}"
-                set_parts.append(f'"{k}" = :{col_key}')
-                params[col_key] = v
-            
-            set_str = ", ".join(set_parts)
-            
-            # Build WHERE clause using original_row fingerprint
-            where_parts = []
-            
-            # Always include ORDER ID
-            where_parts.append('"ORDER ID" = :oid')
-            params["oid"] = update.order_id
-            
-            # Include all other original fields to ensure uniqueness
-            for k, v in update.original_row.items():
-                # Skip ORDER ID since we added it specifically
-                # Skip columns that are being updated (use their ORIGINAL value for the check)
-                if k == "ORDER ID":
-                    continue
-                    
-                # We interpret empty strings/None as needing IS NULL checks or equality to empty string
-                # Ideally, we just check equality.
-                # Note: valid_updates keys shouldn't be used here, we use original_row values
-                
-                param_key = f"cond_{re.sub(r'[^a-zA-Z0-9_]', '_', k.strip())}"
-                
-                if v is None or str(v).lower() in ["nan", "none", ""]:
-                    where_parts.append(f'(CAST("{k}" AS TEXT) IS NULL OR CAST("{k}" AS TEXT) = \'\' OR CAST("{k}" AS TEXT) = \'nan\')')
-                else:
-                    where_parts.append(f'CAST("{k}" AS TEXT) = :{param_key}')
-                    params[param_key] = str(v)
-
-            where_str = " AND ".join(where_parts)
-            
-            sql = text(f'UPDATE "{table_name}" SET {set_str} WHERE {where_str}')
-            
+            sql, params = stmt
             result = conn.execute(sql, params)
             conn.commit()
             
@@ -155,6 +179,40 @@ def update_master_row(update: MasterRowUpdate):
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         connector.close()
+
+@router.post("/update-master-rows")
+def update_master_rows(bulk: MasterRowsBulkUpdate):
+    """Apply several row edits in one request and one transaction.
+
+    Rows whose fingerprint no longer matches are skipped and reported in
+    "conflicts"; the remaining rows are still written.
+    """
+    table_name = bulk.table_name
+    engine, connector = get_db_engine()
+    try:
+        with engine.connect() as conn:
+            updated = 0
+            conflicts = []
+            for row in bulk.rows:
+                stmt = build_row_update(table_name, row.order_id, row.updates, row.original_row)
+                if stmt is None:
+                    continue
+                
+                sql, params = stmt
+                result = conn.execute(sql, params)
+                if result.rowcount == 0:
+                    # Data changed in background or row not found
+                    conflicts.append(row.order_id)
+                    continue
+                updated += result.rowcount
+            
+            conn.commit()
+            return {"status": "success", "updated": updated, "conflicts": conflicts}
+    except Exception as e:
+        logger.error(f"Master Rows Bulk Update error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        connector.close()
         
 @router.post("/upload-master-data")
 def upload_master_data(request: MasterUploadRequest):
@@ -176,7 +234,11 @@ def upload_master_data(request: MasterUploadRequest):
             updated_count = 0
             skipped_count = 0
             error_count = 0
+
+            def safe_param(k):
+                return re.sub(r'[^a-zA-Z0-9_]', '_', k.strip())
             
+            rows = []
             for row in data:
                 # Filter out columns that don't exist in DB
                 valid_row = {k: v for k, v in row.items() if k in db_cols}
@@ -202,63 +264,75 @@ def upload_master_data(request: MasterUploadRequest):
                                 valid_row["DATE"] = pd_date.strftime("%Y-%m-%d")
                     except: pass
 
-                def safe_param(k):
-                    return re.sub(r'[^a-zA-Z0-9_]', '_', k.strip())
+                sku_val = str(valid_row.get("SKU", "")).strip()
+                if sku_val == "None" or not sku_val: sku_val = None
+                rows.append((oid, sku_val, valid_row))
 
+            # Existing rows for the whole batch in one query, keyed by (ORDER ID, SKU)
+            existing = {}
+            oids = sorted({oid for oid, _, _ in rows})
+            if oids:
+                check_sql = text(f'SELECT * FROM "{table_name}" WHERE "ORDER ID" IN :oids').bindparams(
+                    bindparam("oids", expanding=True)
+                )
+                for r in conn.execute(check_sql, {"oids": oids}):
+                    existing_row = dict(r._mapping)
+                    existing.setdefault((str(existing_row.get("ORDER ID")), existing_row.get("SKU")), existing_row)
+            
+            # (sql, params, kind) in row order; written below in runs of identical statements
+            writes = []
+            for oid, sku_val, valid_row in rows:
                 params = {
                     safe_param(k): (None if v == "" else v)
                     for k, v in valid_row.items()
                 }
+                params.update(oid=oid, sku=sku_val)
                 
-                try:
-                    sku_val = str(valid_row.get("SKU", "")).strip()
-                    if sku_val == "None" or not sku_val: sku_val = None
+                existing_data = existing.get((oid, sku_val))
+                if existing_data:
+                    # Normalize for comparison
+                    is_duplicate = True
+                    for k, v in valid_row.items():
+                        if k in ["ORDER ID", "SKU"]: continue
+                        s_inc = str(params[safe_param(k)]) if params[safe_param(k)] is not None else ""
+                        s_db = str(existing_data.get(k)) if existing_data.get(k) is not None else ""
+                        if s_inc != s_db:
+                            is_duplicate = False
+                            break
                     
-                    exists = None
-                    if sku_val:
-                        check_sql = text(f'SELECT * FROM "{table_name}" WHERE "ORDER ID" = :oid AND "SKU" = :sku')
-                        exists = conn.execute(check_sql, {"oid": oid, "sku": sku_val}).fetchone()
-                    else:
-                        check_sql = text(f'SELECT * FROM "{table_name}" WHERE "ORDER ID" = :oid AND "SKU" IS NULL')
-                        exists = conn.execute(check_sql, {"oid": oid}).fetchone()
-                    
-                    if exists:
-                        # Normalize for comparison
-                        existing_data = dict(exists._mapping)
-                        is_duplicate = True
-                        for k, v in valid_row.items():
-                            if k in ["ORDER ID", "SKU"]: continue
-                            s_inc = str(params[safe_param(k)]) if params[safe_param(k)] is not None else ""
-                            s_db = str(existing_data.get(k)) if existing_data.get(k) is not None else ""
-                            if s_inc != s_db:
-                                is_duplicate = False
-                                break
+                    if is_duplicate:
+                        skipped_count += 1
+                        continue
+
+                    # UPDATE
+                    set_parts = [f'"{k}" = :{safe_param(k)}' for k in valid_row.keys() if k not in ["ORDER ID", "SKU"]]
+                    if set_parts:
+                        set_str = ", ".join(set_parts)
+                        where_clause = '"ORDER ID" = :oid'
+                        if sku_val: where_clause += ' AND "SKU" = :sku'
+                        else: where_clause += ' AND "SKU" IS NULL'
                         
-                        if is_duplicate:
-                            skipped_count += 1
-                            continue
+                        writes.append((f'UPDATE "{table_name}" SET {set_str} WHERE {where_clause}', params, "updated"))
+                else:
+                    # INSERT
+                    cols_str = ", ".join([f'"{k}"' for k in valid_row.keys()])
+                    vals_str = ", ".join([f":{safe_param(k)}" for k in valid_row.keys()])
+                    writes.append((f'INSERT INTO "{table_name}" ({cols_str}) VALUES ({vals_str})', params, "inserted"))
+                    existing_data = existing[(oid, sku_val)] = {}
+                # Later rows of this batch compare against what this one writes
+                existing_data.update({k: params[safe_param(k)] for k in valid_row})
 
-                        # UPDATE
-                        set_parts = [f'"{k}" = :{safe_param(k)}' for k in valid_row.keys() if k not in ["ORDER ID", "SKU"]]
-                        if set_parts:
-                            set_str = ", ".join(set_parts)
-                            where_clause = '"ORDER ID" = :oid'
-                            if sku_val: where_clause += ' AND "SKU" = :sku'
-                            else: where_clause += ' AND "SKU" IS NULL'
-                            
-                            sql = text(f'UPDATE "{table_name}" SET {set_str} WHERE {where_clause}')
-                            conn.execute(sql, params)
-                            updated_count += 1
-                    else:
-                        # INSERT
-                        cols_str = ", ".join([f'"{k}"' for k in valid_row.keys()])
-                        vals_str = ", ".join([f":{safe_param(k)}" for k in valid_row.keys()])
-                        sql = text(f'INSERT INTO "{table_name}" ({cols_str}) VALUES ({vals_str})')
-                        conn.execute(sql, params)
-                        success_count += 1
+            # Consecutive rows with the same statement go to the database as one executemany
+            for sql, run in groupby(writes, key=lambda w: w[0]):
+                run = list(run)
+                try:
+                    conn.execute(text(sql), [params for _, params, _ in run])
+                    inserted = sum(kind == "inserted" for _, _, kind in run)
+                    success_count += inserted
+                    updated_count += len(run) - inserted
                 except Exception as row_e:
-                    error_count += 1
-                    logger.error(f"Row {oid} error: {row_e}")
+                    error_count += len(run)
+                    logger.error(f"Rows {[params['oid'] for _, params, _ in run]} error: {row_e}")
             
             # Commit once AFTER all rows in the batch are processed
             conn.commit()
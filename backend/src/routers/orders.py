@@ -8,13 +8,14 @@ import logging
 from src.core.shopify_client import ShopifyClient
 from src.core.auth import get_shopify_access_token
 from src.utils.config import SHOPIFY_URL, SHOPIFY_SHOP_BASE_URL
-from src.utils.utils import create_date_filter_query, order_to_csv_row
+from src.utils.utils import create_date_filter_query, orders_to_columns
 from src.utils.constants import SHOPIFY_ORDER_FIELDNAMES
 from src.processing.transformations import apply_all_transformations
 from src.processing.export_transformations import run_post_edit_transformations
 from src.processing.master_transformations import create_master_transformations
 from src.core.database import get_db_engine
 from src.schemas import OrderUpdate
+from src.routers.master_data import find_existing_order_ids
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -36,13 +37,9 @@ def get_orders(
             "X-Shopify-Access-Token": token
         })
         
-        rows = []
-        for order in client.fetch_orders(filter_query):
-            for line_item in order.line_items:
-                row = order_to_csv_row(order, line_item)
-                rows.append(row)
-        
-        df = pd.DataFrame(rows, columns=SHOPIFY_ORDER_FIELDNAMES)
+        columns = orders_to_columns(client.fetch_orders(filter_query))
+        # Without any line items the empty lists would become float64 columns
+        df = pd.DataFrame(columns, columns=SHOPIFY_ORDER_FIELDNAMES, dtype=None if columns["ORDER ID"] else object)
         
         # Apply standard transformationse
         df = apply_all_transformations(df)
@@ -59,12 +56,30 @@ def get_orders(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/process-transformations")
-def process_transformations(data: List[Dict]):
+def process_transformations(
+    data: List[Dict],
+    annotate_existing: bool = Query(False, description="Add an _exists_in_db column to the master rows"),
+    table_name: str = "historical-data"
+):
     try:
         df = pd.DataFrame(data)
         processed = run_post_edit_transformations(df)
         master = create_master_transformations(processed)
 
+        # Flag orders already stored in the master table, saving the client a second request
+        if annotate_existing and "ORDER ID" in master.columns and not master.empty:
+            engine, connector = get_db_engine()
+            try:
+                with engine.connect() as conn:
+                    order_ids = master["ORDER ID"].astype(str).unique().tolist()
+                    existing = find_existing_order_ids(conn, table_name, order_ids)
+                master["_exists_in_db"] = master["ORDER ID"].astype(str).isin(existing)
+            except Exception as e:
+                # Leave the column out; the client reports the check as unavailable
+                logger.error(f"Error checking existing orders: {e}")
+            finally:
+                connector.close()
+
         # Fix mixed types for Streamlit/Arrow compatibility and JSON safety
         for d in [processed, master]:
             # Clean NaN/Inf
@@ -138,13 +153,9 @@ def search_shopify_orders(
         else:
             query = q
         
-        rows = []
-        for order in client.fetch_orders(query):
-            for line_item in order.line_items:
-                row = order_to_csv_row(order, line_item)
-                rows.append(row)
-        
-        df = pd.DataFrame(rows, columns=SHOPIFY_ORDER_FIELDNAMES)
+        columns = orders_to_columns(client.fetch_orders(query))
+        # Without any line items the empty lists would become float64 columns
+        df = pd.DataFrame(columns, columns=SHOPIFY_ORDER_FIELDNAMES, dtype=None if columns["ORDER ID"] else object)
         df = apply_all_transformations(df)
         df = df.replace([np.inf, -np.inf], np.nan).astype(object).where(pd.notnull(df), None)
         
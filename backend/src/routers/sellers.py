@@ -12,6 +12,7 @@ import csv
 from datetime import datetime
 
 from src.core.auth import get_credentials
+from src.schemas import SellerSheetBatch
 from src.utils.constants import SELLER_FIELDNAMES, SHOPIFY_ORDER_FIELDNAMES, FOLDER_ID
 from src.processing.seller_logic import update_column_k, update_seller_delivery, apply_td_to_vd
 from googleapiclient.discovery import build
@@ -138,6 +139,13 @@ def fetch_single_seller_ongoing(sid: str):
             logger.error(f"Error fetching sheet {sid}: {e}")
             return []
 
+@router.post("/fetch-seller-ongoing-batch")
+def fetch_seller_ongoing_batch(batch: SellerSheetBatch):
+    """'Ongoing' rows of several sheets in one call, concatenated in the order of `sids`."""
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = executor.map(fetch_single_seller_ongoing, batch.sids)
+        return [row for rows in results for row in rows]
+
 @router.post("/finalize-seller-data")
 def finalize_seller_data(rows: List[dict]):
     """Applies final transformations and OD numbering to aggregated rows."""
@@ -19,6 +19,15 @@ class MasterRowUpdate(BaseModel):
     original_row: Dict[str, Any] # Full fingerprint of the row before edit
     updates: Dict[str, Any]
 
+class MasterRowEdit(BaseModel):
+    order_id: str
+    original_row: Dict[str, Any]
+    updates: Dict[str, Any]
+
+class MasterRowsBulkUpdate(BaseModel):
+    table_name: str = "historical-data"
+    rows: List[MasterRowEdit]
+
 class MasterUploadRequest(BaseModel):
     table_name: str = "historical-data"
     data: List[Dict]
@@ -27,3 +36,6 @@ class MasterRowDelete(BaseModel):
     table_name: str = "historical-data"
     order_id: str
     original_row: Dict[str, Any]
+
+class SellerSheetBatch(BaseModel):
+    sids: List[str]
@@ -3,11 +3,27 @@ Utility functions for data processing and formatting.
 """
 from datetime import datetime
 import pytz
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional
 from src.core.models import Order, LineItem
 from src.utils.constants import SHOPIFY_ORDER_FIELDNAMES
 import phonenumbers
 
+# Line item custom attributes copied into CSV columns of the same name
+ATTRIBUTE_FIELDS = (
+    "Select Delivery City",
+    "Delivery Instructions (for drivers)",
+    "Order Instructions (for sellers)",
+    "Delivery Time",
+    "Dinner Delivery",
+    "Lunch Delivery",
+    "Lunch Delivery Time",
+    "Lunch Time",
+    "Delivery between",
+    "deliverytime_edit",
+    "Select Start Date",
+    "Delivery city",
+)
+
 def clean(val: Any) -> Any:
     """
     Ensure nulls/nones/blanks become 0.
@@ -18,7 +34,10 @@ def clean(val: Any) -> Any:
     Returns:
         Original value if valid, otherwise 0
     """
-    return val if val not in [None, "", []] else 0
+    # Direct checks rather than building a list to search on every call
+    if val is None or val == "" or val == []:
+        return 0
+    return val
 
 
 def create_date_filter_query(start_date_str: str, end_date_str: str, timezone: str = 'US/Eastern') -> str:
@@ -44,20 +63,17 @@ def create_date_filter_query(start_date_str: str, end_date_str: str, timezone: s
     return f"created_at:>='{start_dt.isoformat()}' AND created_at:<='{end_dt.isoformat()}'"
 
 
-def order_to_csv_row(order: Order, line_item: LineItem) -> Dict[str, Any]:
+def _order_fields(order: Order) -> Dict[str, Any]:
     """
-    Convert an order and line item to a CSV row dictionary.
+    Cleaned order-level CSV fields, shared by all of the order's line items.
     
     Args:
         order: Order instance
-        line_item: LineItem instance
         
     Returns:
-        Dictionary with CSV field names as keys
+        Dictionary of the order-level CSV fields
     """
     shipping = order.shipping_address
-    globo = line_item.custom_attributes
-    
     return {
         "ORDER ID": clean(order.name),
         "DATE": clean(order.created_at),
@@ -67,9 +83,38 @@ def order_to_csv_row(order: Order, line_item: LineItem) -> Dict[str, Any]:
         "EMAIL": clean(order.email),
         "HOUSE UNIT NO": clean(shipping.address2 if shipping else None),
         "ADDRESS LINE 1": clean(shipping.address1 if shipping else None),
-        "Select Delivery City": clean(globo.get('Select Delivery City')),
         "Shipping address city": clean(shipping.city if shipping else None),
         "ZIP": clean(shipping.zip if shipping else None),
+    }
+
+
+def order_to_csv_row(order: Order, line_item: LineItem, order_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convert an order and line item to a CSV row dictionary.
+    
+    Args:
+        order: Order instance
+        line_item: LineItem instance
+        order_fields: Precomputed _order_fields(order), to skip recomputing them per line item
+        
+    Returns:
+        Dictionary with CSV field names as keys
+    """
+    o = order_fields if order_fields is not None else _order_fields(order)
+    globo = line_item.custom_attributes
+    
+    return {
+        "ORDER ID": o["ORDER ID"],
+        "DATE": o["DATE"],
+        "NAME": o["NAME"],
+        "Shipping address phone numeric": o["Shipping address phone numeric"],
+        "phone_edit": o["phone_edit"],
+        "EMAIL": o["EMAIL"],
+        "HOUSE UNIT NO": o["HOUSE UNIT NO"],
+        "ADDRESS LINE 1": o["ADDRESS LINE 1"],
+        "Select Delivery City": clean(globo.get('Select Delivery City')),
+        "Shipping address city": o["Shipping address city"],
+        "ZIP": o["ZIP"],
         "SKU": clean(line_item.sku),
         "Delivery Instructions (for drivers)": clean(globo.get('Delivery Instructions (for drivers)')),
         "Order Instructions (for sellers)": clean(globo.get('Order Instructions (for sellers)')),
@@ -84,3 +129,54 @@ def order_to_csv_row(order: Order, line_item: LineItem) -> Dict[str, Any]:
         "Select Start Date": clean(globo.get('Select Start Date')),
         "Delivery city": clean(globo.get('Delivery city'))
     }
+
+
+def order_to_csv_rows(order: Order) -> List[Dict[str, Any]]:
+    """
+    Convert an order to one CSV row dictionary per line item.
+    
+    Order-level fields (including the phone number parse) are computed once
+    for the order rather than once per line item.
+    
+    Args:
+        order: Order instance
+        
+    Returns:
+        List of dictionaries with CSV field names as keys
+    """
+    if not order.line_items:
+        return []
+    order_fields = _order_fields(order)
+    return [order_to_csv_row(order, line_item, order_fields) for line_item in order.line_items]
+
+
+def orders_to_columns(orders: Iterable[Order]) -> Dict[str, List[Any]]:
+    """
+    Convert orders to CSV columns, one list per field with one entry per line item.
+    
+    Same values as order_to_csv_rows, but filled column by column so no
+    per-row dictionaries are built; order-level fields are repeated once
+    per order with a single extend.
+    
+    Args:
+        orders: Iterable of Order instances
+        
+    Returns:
+        Dictionary mapping each of SHOPIFY_ORDER_FIELDNAMES to its column values
+    """
+    columns = {name: [] for name in SHOPIFY_ORDER_FIELDNAMES}
+    sku, quantity = columns["SKU"], columns["QUANTITY"]
+    attributes = [(name, columns[name]) for name in ATTRIBUTE_FIELDS]
+    for order in orders:
+        line_items = order.line_items
+        if not line_items:
+            continue
+        for name, value in _order_fields(order).items():
+            columns[name].extend([value] * len(line_items))
+        for line_item in line_items:
+            globo = line_item.custom_attributes
+            sku.append(clean(line_item.sku))
+            quantity.append(clean(line_item.quantity))
+            for name, column in attributes:
+                column.append(clean(globo.get(name)))
+    return columns
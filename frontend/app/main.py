@@ -1,19 +1,13 @@
 import streamlit as st
 import pandas as pd
 from functools import partial
+import importlib
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Import Pages
-from pages.dashboard import dashboard_page
-from pages.delivery import delivery_management_page
-from pages.seller_aggregated import seller_data_page
-from pages.master_db import master_database_page
-from pages.seller_dashboard import seller_page
-from pages.instructions import instructions_page
 from utils.api import load_sellers_api
 
 # Import authentication components
@@ -37,53 +31,32 @@ st.set_page_config(
 )
 
 # Custom CSS: wider layout + table cell wrapping
-st.markdown("""
-    <style>
-    .main { padding: 2rem; }
-    /* Wider view for all pages - use most of viewport */
-    section.main .block-container,
-    div[data-testid="stAppViewContainer"] main .block-container {
-        max-width: 98%;
-        padding-left: 2rem;
-        padding-right: 2rem;
-        width: 98%;
-    }
-    /* Force dataframe containers to use full width */
-    div[data-testid="stDataFrame"] {
-        width: 100% !important;
-        max-width: 100% !important;
-    }
-    /* Wrap text in all dataframe and data_editor tables so content fits in cells */
-    div[data-testid="stDataFrame"] td,
-    div[data-testid="stDataFrame"] th,
-    div[data-testid="stDataFrame"] table {
-        white-space: normal !important;
-        word-wrap: break-word !important;
-        word-break: break-word !important;
-        word-break: break-word !important;
-    }
-    div[data-testid="stDataFrame"] td,
-    div[data-testid="stDataFrame"] th {
-        max-width: 280px;
-    }
-    .stButton>button {
-        width: 100%;
-        background-color: #E05600;
-        color: white;
-        font-weight: 600;
-        padding: 0.75rem 1rem;
-        border-radius: 8px;
-        border: none;
-        transition: all 0.3s ease;
-    }
-    .stButton>button:hover {
-        background-color: #BF4A00;
-        box-shadow: 0 4px 12px rgba(224, 86, 0, 0.3);
-    }
-    h1, h2, h3 { color: #E05600 !important; font-weight: 700 !important; }
-    [data-testid="stMetricValue"] { color: #E05600 !important; }
-    </style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def _load_css():
+    with open(os.path.join(os.path.dirname(__file__), "assets", "app.css")) as f:
+        return f"<style>{f.read()}</style>"
+
+st.markdown(_load_css(), unsafe_allow_html=True)
+
+def _lazy(modname, fn):
+    """Page callable that imports its module on first use, so only visited pages are loaded."""
+    def _run(*args, **kwargs):
+        return getattr(importlib.import_module(modname), fn)(*args, **kwargs)
+    # st.Page derives the default url path from the function name
+    _run.__name__ = fn
+    return _run
+
+# Pages (imported when first opened)
+dashboard_page = _lazy("pages.dashboard", "dashboard_page")
+delivery_management_page = _lazy("pages.delivery", "delivery_management_page")
+seller_data_page = _lazy("pages.seller_aggregated", "seller_data_page")
+master_database_page = _lazy("pages.master_db", "master_database_page")
+seller_page = _lazy("pages.seller_dashboard", "seller_page")
+instructions_page = _lazy("pages.instructions", "instructions_page")
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _sellers():
+    return load_sellers_api()
 
 def main():
     # Initialize authentication state
@@ -121,22 +94,30 @@ def main():
         "Master DB": st.Page(master_database_page, title="Master Database", icon="🗄️"),
     }
     
-    # Dynamic Seller Pages
-    sellers_df = load_sellers_api()
-    seller_pages = []
-    for _, row in sellers_df.iterrows():
-        s_name = str(row['SELLER NAME'])
-        s_code = str(row['SELLER CODE'])
-        s_path = str(row['WEB_ADDRESS_EXTENSION'])
-        
-        seller_pages.append(
+    # Dynamic Seller Pages (rebuilt only when the seller list changes)
+    sellers_df = _sellers()
+    if sellers_df.empty:
+        # Don't keep a failed lookup cached
+        _sellers.clear()
+    sellers_key = tuple(
+        zip(
+            sellers_df['SELLER NAME'].astype(str),
+            sellers_df['SELLER CODE'].astype(str),
+            sellers_df['WEB_ADDRESS_EXTENSION'].astype(str)
+        )
+    )
+    if st.session_state.get('seller_pages_key') != sellers_key:
+        st.session_state.seller_pages = [
             st.Page(
                 partial(seller_page, s_name, s_code),
                 title=s_name,
                 icon="👤",
                 url_path=s_path
             )
-        )
+            for s_name, s_code, s_path in sellers_key
+        ]
+        st.session_state.seller_pages_key = sellers_key
+    seller_pages = st.session_state.seller_pages
 
     # 2. Setup Navigation (position="hidden" allows us to build custom sidebar)
     all_pages_list = list(pages.values()) + seller_pages
@@ -7,12 +7,208 @@ from utils.api import (
     process_transformations_api,
     upload_master_data_api,
     sanitize_df,
+    search_blob,
     get_auth,
-    check_existing_ids_api
+    get_api_client
 )
-import pandas as pd
+import numpy as np
+from math import ceil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+PAGE_SIZE = 100
+
+# Columns matched by the preview filter
+SEARCH_COLS = ('ORDER ID', 'NAME', 'EMAIL', 'PHONE', 'ADDRESS LINE 1', 'CITY', 'SKU', 'PRODUCT')
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_and_process(start_date, end_date):
+    """Fetch a date window from Shopify and run the master transformations, cached per window.
+
+    Returns the master frame and the set of its order IDs already in the database
+    (None if the backend could not check).
+    """
+    df = fetch_orders_from_api(start_date, end_date)
+    processed, master = process_transformations_api(df, annotate_existing=True)
+    existing_ids = None
+    if "_exists_in_db" in master.columns:
+        # The flag arrives as a JSON boolean but may already be stringified by sanitize_df
+        on_db = master["_exists_in_db"].astype(str).str.strip().str.lower() == "true"
+        existing_ids = frozenset(master.loc[on_db.to_numpy(), "ORDER ID"].astype(str))
+        master = master.drop(columns=["_exists_in_db"])
+    return master, existing_ids
+
+
+@st.cache_data(show_spinner=False)
+def _build_display_df(df, existing_ids):
+    """master_data plus the Select column and On-DB markers, rebuilt only when either input changes."""
+    out = df.copy()
+    if "Select" not in out.columns:
+        out.insert(0, "Select", np.ones(len(out), dtype=bool))
+    if "ORDER ID" in out.columns:
+        oids = out["ORDER ID"].astype(str)
+        out["ORDER ID"] = np.where(oids.isin(existing_ids), oids + " ✅ (On DB)", oids)
+    return out
+
+
+@st.cache_data(show_spinner=False)
+def _df_to_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@st.fragment
+def _preview_and_upload(master, existing_ids):
+    """Filter, preview and upload block; reruns on its own so filtering and
+    editing don't re-execute the rest of the page."""
+    # Simple search (applied on submit only)
+    with st.form("filter_form", clear_on_submit=False):
+        search = st.text_input("Filter database view", placeholder="Search order ID, name, email, phone...")
+        st.form_submit_button("Apply Filter")
+
+    # 1. Selection column (default True) and On-DB markers
+    df_display = _build_display_df(master, existing_ids)
+
+    # Re-apply edits made on any page (keyed by the master_data index)
+    edits = st.session_state.setdefault("dashboard_edits", {})
+    for idx, changes in edits.items():
+        for col, val in changes.items():
+            if idx in df_display.index and col in df_display.columns:
+                df_display.at[idx, col] = val
+
+    # Plain substring match over the search columns only (skip single characters)
+    if len(search.strip()) >= 2:
+        mask = search_blob(df_display, SEARCH_COLS).str.contains(search.strip().lower(), regex=False)
+        df_display = df_display[mask.to_numpy()]
+
+    # Only the visible window is sent to the browser
+    total_pages = max(1, ceil(len(df_display) / PAGE_SIZE))
+    page = 1
+    if total_pages > 1:
+        page = int(st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1))
+    start = (page - 1) * PAGE_SIZE
+    df_view = df_display.iloc[start : start + PAGE_SIZE]
+    st.caption(f"Showing rows {start + 1 if len(df_view) else 0}-{start + len(df_view)} of {len(df_display)}")
+
+    # Use data_editor to allow checkbox selection
+    # edited_rows are positions in this view: one editor per fetch, filter and page
+    editor_key = f"dashboard_upload_editor_{st.session_state.get('dashboard_fetch_gen', 0)}_{search.strip()}_{page}"
+    st.data_editor(
+        df_view, 
+        use_container_width=True, 
+        hide_index=True,
+        column_config={"Select": st.column_config.CheckboxColumn(required=True)},
+        key=editor_key
+    )
+
+    # Merge this page's edits back into the full frame
+    for pos, changes in st.session_state[editor_key].get("edited_rows", {}).items():
+        idx = df_view.index[int(pos)]
+        edits.setdefault(idx, {}).update(changes)
+        for col, val in changes.items():
+            df_display.at[idx, col] = val
+
+    c1, c2 = st.columns(2)
+    with c1:
+        csv = _df_to_csv(master)
+        st.download_button(
+            "📥 Download Master CSV", csv, "master_data.csv", "text/csv"
+        )
+    with c2:
+        if st.button("🚀 Upload Selected to Database", help="Insert selected records into PostgreSQL"):
+            # Filter for selected rows
+            selected_rows = df_display[df_display["Select"] == True]
+
+            if selected_rows.empty:
+                st.warning("No records selected. Please check at least one row.")
+            else:
+                try:
+                    # Sanitize dataframe before upload
+                    df_clean = selected_rows.drop(columns=["Select"])
+
+                    # Fix ORDER ID (remove " ✅ (On DB)" suffix if present)
+                    if "ORDER ID" in df_clean.columns:
+                        df_clean["ORDER ID"] = df_clean["ORDER ID"].astype(str).str.split().str[0]
+
+                    # Ensure datetime columns are strings (NaT -> None)
+                    for col in df_clean.select_dtypes(include=['datetime', 'datetimetz']).columns:
+                        df_clean[col] = df_clean[col].dt.strftime('%Y-%m-%d %H:%M:%S').astype(object).where(df_clean[col].notna(), None)
+
+                    # Chunked Upload (chunks are sent concurrently; each frame slice
+                    # is serialized to JSON directly, NaN/None becoming "").
+                    # Each request checks existing rows on its own, so all rows of an
+                    # order go in the same chunk and can't race each other into duplicates
+                    chunk_size = 50
+                    total_rows = len(df_clean)
+                    if "ORDER ID" in df_clean.columns:
+                        order_rows = df_clean.groupby("ORDER ID", sort=False).indices.values()
+                    else:
+                        order_rows = [np.arange(i, min(i + chunk_size, total_rows)) for i in range(0, total_rows, chunk_size)]
+                    chunks, pending, pending_len = [], [], 0
+                    for rows in order_rows:
+                        pending.append(rows)
+                        pending_len += len(rows)
+                        if pending_len >= chunk_size:
+                            chunks.append(df_clean.iloc[np.concatenate(pending)])
+                            pending, pending_len = [], 0
+                    if pending:
+                        chunks.append(df_clean.iloc[np.concatenate(pending)])
+
+                    progress_container = st.empty()
+                    status_text = st.empty()
+
+                    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+                    # Both resolved here: the worker threads have no script context
+                    auth = get_auth()
+                    client = get_api_client()
+                    failed = []
+                    saved_rows = 0
+                    uploaded_ids = set()
+
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        futures = {executor.submit(upload_master_data_api, chunk, auth=auth, session=client): chunk for chunk in chunks}
+                        for done, future in enumerate(as_completed(futures), 1):
+                            chunk = futures[future]
+                            try:
+                                res = future.result()
+                            except Exception as chunk_e:
+                                # Other chunks are committed independently; keep going and report
+                                failed.append(chunk_e)
+                            else:
+                                for k in totals:
+                                    totals[k] += res.get(k, 0)
+                                saved_rows += len(chunk)
+                                if "ORDER ID" in chunk.columns:
+                                    uploaded_ids.update(chunk["ORDER ID"].astype(str))
+
+                            status_text.markdown(f"**Uploading:** {done}/{len(chunks)} chunks ({total_rows} records)")
+                            progress_container.progress(done / len(chunks))
+
+                    progress_container.empty()
+                    status_text.empty()
+
+                    summary = f"New: {totals['inserted']}, Updated: {totals['updated']}, Skipped: {totals['skipped']}"
+                    if failed and not saved_rows:
+                        st.error(f"Upload Failed: {failed[0]}")
+                    else:
+                        # Uploaded orders are now on the DB; cached fetches no longer reflect that
+                        st.session_state.dashboard_existing_ids = frozenset(existing_ids | uploaded_ids)
+                        _fetch_and_process.clear()
+                        if failed:
+                            st.session_state.dashboard_upload_msg = (
+                                "warning",
+                                f"⚠️ Upload partly failed: {len(failed)} of {len(chunks)} chunks not saved ({failed[0]}). "
+                                f"{saved_rows} of {total_rows} records were saved. {summary}"
+                            )
+                        else:
+                            st.session_state.dashboard_upload_msg = ("success", f"✅ Upload Complete! {summary}")
+                        # Full rerun: the page-level warning and this fragment's existing_ids argument
+                        # are only refreshed outside the fragment
+                        st.rerun(scope="app")
+
+                except Exception as e:
+                    st.error(f"Upload Failed: {e}")
+
 
 def dashboard_page():
     st.title("🛍️ Daily Orders Data")
@@ -24,14 +220,20 @@ def dashboard_page():
     with col2:
         e_date = st.date_input("End Date", value=datetime.now())
 
+    force_refresh = st.checkbox("Force refresh", help="Ignore results cached in the last hour and fetch again from Shopify")
+
     if st.button("🔍 Fetch & Process Orders"):
         try:
             with st.spinner("Executing Shopify sync..."):
-                df = fetch_orders_from_api(
+                if force_refresh:
+                    _fetch_and_process.clear()
+                master, existing_ids = _fetch_and_process(
                     s_date.strftime("%Y-%m-%d"), e_date.strftime("%Y-%m-%d")
                 )
-                processed, master = process_transformations_api(df)
                 st.session_state.master_data = master
+                st.session_state.dashboard_existing_ids = existing_ids
+                st.session_state.dashboard_edits = {}
+                st.session_state.dashboard_fetch_gen = st.session_state.get("dashboard_fetch_gen", 0) + 1
                 st.success("Successfully processed!")
         except Exception as e:
             st.error(f"Error: {e}")
@@ -39,103 +241,16 @@ def dashboard_page():
     if st.session_state.get("master_data") is not None:
         st.header("Shopify Data Preview")
 
-        # Simple search
-        search = st.text_input("Filter database view")
-        
-        df_display = st.session_state.master_data.copy()
-        
-        # 1. Add Selection Column (Default True)
-        if "Select" not in df_display.columns:
-            df_display.insert(0, "Select", True)
-        
-        if "ORDER ID" in df_display.columns:
-            try:
-                unique_ids = df_display["ORDER ID"].unique().tolist()
-                existing_ids = set(check_existing_ids_api(unique_ids))
-                
-                if existing_ids:
-                    st.warning("⚠️ Some orders have already been saved in Master Database")
-                
-                def mark_existing(oid):
-                    str_oid = str(oid)
-                    if str_oid in existing_ids:
-                        return f"{str_oid} ✅ (On DB)"
-                    return str_oid
-                
-                df_display["ORDER ID"] = df_display["ORDER ID"].apply(mark_existing)
-            except Exception as e:
-                st.warning(f"Could not check existing orders: {e}")
-
-        if search:
-            mask = df_display.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-            df_display = df_display[mask]
-
-        # Use data_editor to allow checkbox selection
-        edited_df = st.data_editor(
-            df_display, 
-            use_container_width=True, 
-            hide_index=True,
-            key="dashboard_upload_editor"
-        )
+        master = st.session_state.master_data
+        existing_ids = st.session_state.get("dashboard_existing_ids")
+        if existing_ids is None:
+            st.warning("Could not check existing orders")
+            existing_ids = frozenset()
+        elif existing_ids:
+            st.warning("⚠️ Some orders have already been saved in Master Database")
+
+        upload_msg = st.session_state.pop("dashboard_upload_msg", None)
+        if upload_msg:
+            getattr(st, upload_msg[0])(upload_msg[1])
 
-        c1, c2 = st.columns(2)
-        with c1:
-            csv = st.session_state.master_data.to_csv(index=False)
-            st.download_button(
-                "📥 Download Master CSV", csv, "master_data.csv", "text/csv"
-            )
-        with c2:
-            if st.button("🚀 Upload Selected to Database", help="Insert selected records into PostgreSQL"):
-                # Filter for selected rows
-                selected_rows = edited_df[edited_df["Select"] == True].copy()
-                
-                if selected_rows.empty:
-                    st.warning("No records selected. Please check at least one row.")
-                else:
-                    try:
-                        # Sanitize dataframe before upload
-                        df_clean = selected_rows.drop(columns=["Select"])
-                        
-                        # Fix ORDER ID (remove " ✅ (On DB)" suffix if present)
-                        if "ORDER ID" in df_clean.columns:
-                            df_clean["ORDER ID"] = df_clean["ORDER ID"].astype(str).str.split().str[0]
-                        
-                        # Convert object columns containing NaNs to None/Empty string to avoid JSON errors
-                        df_clean = df_clean.where(pd.notnull(df_clean), None)
-                        
-                        # Ensure datetime columns are strings
-                        for col in df_clean.select_dtypes(include=['datetime', 'datetimetz']).columns:
-                            df_clean[col] = df_clean[col].astype(str).replace('NaT', None)
-                            
-                        data = df_clean.to_dict(orient="records")
-                        
-                        # Chunked Upload
-                        chunk_size = 50
-                        total_rows = len(data)
-                        
-                        progress_container = st.empty()
-                        status_text = st.empty()
-                        
-                        total_inserted = 0
-                        total_updated = 0
-                        total_skipped = 0
-                        
-                        for i in range(0, total_rows, chunk_size):
-                            chunk = data[i : i + chunk_size]
-                            percent = min(100, int((i + len(chunk)) / total_rows * 100))
-                            
-                            status_text.markdown(f"**Uploading:** {percent}% ({i + len(chunk)}/{total_rows} records)")
-                            progress_container.progress(percent / 100)
-                            
-                            res = upload_master_data_api(chunk)
-                            
-                            total_inserted += res.get('inserted', 0)
-                            total_updated += res.get('updated', 0)
-                            total_skipped += res.get('skipped', 0)
-                        
-                        progress_container.empty()
-                        status_text.empty()
-                        st.success(f"✅ Upload Complete! New: {total_inserted}, Updated: {total_updated}, Skipped: {total_skipped}")
-                        
-                    except Exception as e:
-                        st.error(f"Upload Failed: {e}")
+        _preview_and_upload(master, existing_ids)
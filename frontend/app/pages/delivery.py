@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
-import time
+import re
 from utils.api import (
     get_order_details, 
     update_manual_fields_api, 
     update_master_row_api, 
-    sanitize_df,
     search_shopify_orders_api,
+    process_transformations_api,
     upload_master_data_api,
     check_existing_ids_api
 )
@@ -16,12 +17,301 @@ from utils.api import (
 SUPERUSER_USERNAME = os.getenv("SUPERUSER_USERNAME", "admin")
 SUPERUSER_PASSWORD = os.getenv("SUPERUSER_PASSWORD", "admin")
 
+# Skip slot columns and the keys /update-order expects for them
+SKIP_FIELDS = tuple(f"SKIP{i}" for i in range(1, 21))
+SKIP_TO_SKU = {field: field.replace("SKIP", "SKU") for field in SKIP_FIELDS}
+
+# Order statuses offered in the edit form
+STATUS_OPTIONS = ("WIP", "PAUSE", "TBS", "LAST DAY", "CANCELLED", "DELIVERED")
+STATUS_IDX = {s: i for i, s in enumerate(STATUS_OPTIONS)}
+
+# Shopify order names, optionally with '#' and a -WTD/-GTD style suffix
+ORDER_ID_PATTERN = re.compile(r"^#?\d+(-[A-Za-z]+)?$")
+
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def _cached_order_details(order_id):
+    """get_order_details, cached briefly so reruns don't refetch the same order."""
+    return get_order_details(order_id)
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner="Talking to Shopify...")
+def _cached_shopify_search(query):
+    """Shopify search followed by the master transformations; None when nothing matched."""
+    s_results = search_shopify_orders_api(query)
+    if s_results.empty:
+        return None
+    # Apply same processing as Shopify Dashboard
+    processed, master = process_transformations_api(s_results)
+    return master
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def _cached_existing_ids(ids_key):
+    """check_existing_ids_api for a sorted tuple of order IDs."""
+    return frozenset(str(x) for x in check_existing_ids_api(list(ids_key)))
+
+
+def _search_orders(search_id):
+    """Load an order into the DB tab, keeping the outcome message for the next render."""
+    try:
+        orders_df = pd.DataFrame(_cached_order_details(search_id))
+        st.session_state.delivery_search_results_df = orders_df
+        st.session_state.delivery_search_msg = ("success", f"Found {len(orders_df)} record(s) for Order #{search_id}")
+    except Exception as e:
+        st.session_state.pop("delivery_search_results_df", None)
+        st.session_state.delivery_search_msg = ("error", f"Order not found in DB: {e}")
+
+
+def _on_search_change():
+    search_id = st.session_state.db_search_input.strip()
+    if ORDER_ID_PATTERN.match(search_id):
+        _search_orders(search_id)
+
+
+@st.fragment
+def _db_tab(is_superuser):
+    """Search and edit synced records; reruns independently of the other sections."""
+    st.header("Search & Edit Database Records")
+    st.caption("Look up orders that have already been synced to the system.")
+
+    # Searches as soon as a valid ID is entered; the button forces a fresh lookup
+    search_id = st.text_input("Enter Order ID", placeholder="e.g. 123456789", key="db_search_input", on_change=_on_search_change).strip()
+    if st.button("🔍 Search Database", key="db_search_btn"):
+        if not ORDER_ID_PATTERN.match(search_id):
+            st.error("Enter a valid Order ID, e.g. 123456 or #123456-WTD")
+        else:
+            _cached_order_details.clear()
+            _search_orders(search_id)
+
+    msg = st.session_state.pop("delivery_search_msg", None)
+    if msg:
+        getattr(st, msg[0])(msg[1])
+
+    orders_df = st.session_state.get("delivery_search_results_df")
+    if orders_df is not None and not orders_df.empty:
+        first = orders_df.iloc[0]
+        st.subheader(f"Order #{first.get('ORDER ID')} - {first.get('NAME')}")
+        st.markdown(f"**📍 Address:** {first.get('HOUSE UNIT NO')} {first.get('ADDRESS LINE 1')}, {first.get('CITY')}")
+
+        # One table for all items rather than an expander per SKU
+        display_cols = [c for c in ["SKU", "PRODUCT", "QUANTITY", "STATUS", "DELIVERY", "DELIVERY TIME", "DRIVER NOTE", "TS NOTES"] if c in orders_df.columns]
+        st.dataframe(orders_df[display_cols], use_container_width=True, hide_index=True)
+
+        if is_superuser:
+            # Only the selected item gets an edit form
+            sel_idx = st.radio(
+                "Edit SKU",
+                range(len(orders_df)),
+                format_func=lambda i: f"📦 {orders_df['SKU'].iat[i]} ({orders_df['STATUS'].iat[i]})",
+                horizontal=True,
+                key=f"edit_sku_{search_id}"
+            )
+            order = orders_df.iloc[sel_idx].to_dict()
+
+            # EDITABLE FORM FOR ADMIN
+            with st.form(key=f"edit_form_{search_id}_{sel_idx}"):
+                st.write("### ✏️ Edit Order Record")
+
+                c1, c2 = st.columns(2)
+                with c1:
+                    new_name = st.text_input("Customer Name", value=order.get('NAME', ''))
+                    new_email = st.text_input("Email", value=order.get('EMAIL', ''))
+                    new_phone = st.text_input("Phone", value=order.get('  PHONE', '')) # Note space in key
+                with c2:
+                    new_unit = st.text_input("House/Unit No", value=order.get('HOUSE UNIT NO', ''))
+                    new_addr = st.text_input("Address Line 1", value=order.get('ADDRESS LINE 1', ''))
+                    new_city = st.text_input("City", value=order.get('CITY', ''))
+
+                st.write("---")
+                p1, p2, p3 = st.columns(3)
+                with p1:
+                    new_prod = st.text_input("Product", value=order.get('PRODUCT', ''))
+                    new_code = st.text_input("Product Code", value=order.get('PRODUCT CODE', ''))
+                with p2:
+                    new_meal = st.text_input("Meal Type", value=order.get('MEAL TYPE', ''))
+                    new_plan = st.text_input("Meal Plan", value=order.get('MEAL PLAN', ''))
+                with p3:
+                    new_qty = st.text_input("Quantity", value=order.get('QUANTITY', ''))
+                    new_status = st.selectbox("Status", options=STATUS_OPTIONS, index=STATUS_IDX.get(order.get('STATUS'), 0))
+
+                st.write("---")
+                t1, t2 = st.columns(2)
+                with t1:
+                    new_del = st.text_input("Delivery Method", value=order.get('DELIVERY', ''))
+                    new_time = st.text_input("Delivery Time", value=order.get('DELIVERY TIME', ''))
+                with t2:
+                    new_ts = st.text_area("TS Notes", value=order.get('TS NOTES', ''))
+                    new_driver = st.text_area("Driver Note", value=order.get('DRIVER NOTE', ''))
+
+                if st.form_submit_button("✅ Save Changes to Database"):
+                    updates = {
+                        "NAME": new_name, "EMAIL": new_email, "  PHONE": new_phone,
+                        "HOUSE UNIT NO": new_unit, "ADDRESS LINE 1": new_addr, "CITY": new_city,
+                        "PRODUCT": new_prod, "PRODUCT CODE": new_code, "MEAL TYPE": new_meal,
+                        "MEAL PLAN": new_plan, "QUANTITY": new_qty, "STATUS": new_status,
+                        "DELIVERY": new_del, "DELIVERY TIME": new_time,
+                        "TS NOTES": new_ts, "DRIVER NOTE": new_driver
+                    }
+                    try:
+                        update_master_row_api(order.get("ORDER ID"), updates, order)
+                        _cached_order_details.clear()
+                        st.toast("Successfully updated record!", icon="✅")
+                        # Refresh data
+                        st.session_state.delivery_search_results_df = pd.DataFrame(_cached_order_details(search_id))
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Save failed: {e}")
+
+
+@st.fragment
+def _shopify_tab():
+    """Shopify live search and upload; reruns independently of the other sections."""
+    st.header("Shopify Live Search")
+    st.caption("Search directly in Shopify. Found orders can be uploaded to the Master Data.")
+
+    search_q = st.text_input("Search Shopify (Name, ID, Email, Address, etc.)", placeholder="e.g. #1005 or customer name")
+    if st.button("🚀 Search Shopify"):
+        if search_q.strip():
+            try:
+                master = _cached_shopify_search(search_q.strip())
+                if master is None:
+                    st.warning("No matches found in Shopify.")
+                    st.session_state.pop("shopify_master_results", None)
+                else:
+                    st.session_state.shopify_master_results = master
+                    st.session_state.pop("shopify_ids_key", None)
+                    st.success(f"Found and processed {len(master)} record(s) from Shopify")
+            except Exception as e:
+                st.error(f"Shopify search failed: {e}")
+
+    if st.session_state.get("shopify_master_results") is not None:
+        sm_df = st.session_state.shopify_master_results.copy()
+
+        # 1. Add Selection Column
+        if "Select" not in sm_df.columns:
+            sm_df.insert(0, "Select", False)
+
+        # Check for existing orders
+        try:
+            # Only re-check when the set of IDs changed, not on every checkbox toggle
+            oids = sm_df["ORDER ID"].astype(str)
+            ids_key = tuple(sorted(oids.unique()))
+            if st.session_state.get("shopify_ids_key") != ids_key:
+                st.session_state.shopify_existing_ids = _cached_existing_ids(ids_key) if ids_key else frozenset()
+                st.session_state.shopify_ids_key = ids_key
+            existing_ids = st.session_state.shopify_existing_ids
+
+            if existing_ids:
+                st.warning("⚠️ Some orders have been saved in master Database")
+
+            sm_df["ORDER ID"] = np.where(oids.isin(existing_ids), oids + " ✅ (On DB)", oids)
+        except Exception as e:
+            st.warning(f"Could not check existing orders: {e}")
+
+        st.write("### Processed Results (Preview & Edit)")
+        st.info("✏️ Check/Uncheck rows to select which ones to upload. You can also edit values directly.")
+
+        # Editable Data View
+        edited_s_df = st.data_editor(
+            sm_df,
+            use_container_width=True,
+            hide_index=True,
+            num_rows="fixed",
+            key="shopify_sync_editor"
+        )
+
+        if st.button("⬆️ Upload Selected to Master Database"):
+            # Filter for selected rows
+            selected_rows = edited_s_df[edited_s_df["Select"] == True]
+
+            if selected_rows.empty:
+                st.warning("No records selected. Please check at least one row.")
+            else:
+                try:
+                    with st.spinner(f"Uploading {len(selected_rows)} record(s)..."):
+                        # Remove the 'Select' column and the On-DB marker before sending to API
+                        upload_df = selected_rows.drop(columns=["Select"])
+                        upload_df["ORDER ID"] = upload_df["ORDER ID"].astype(str).str.removesuffix(" ✅ (On DB)")
+
+                        # The API helper sanitizes NaN/None column-wise in one pass
+                        res = upload_master_data_api(upload_df)
+                        _cached_existing_ids.clear()
+                        st.session_state.pop("shopify_ids_key", None)
+                        st.toast(f"Upload Complete! New: {res.get('inserted')}, Updated: {res.get('updated')}", icon="✅")
+
+                        # Keep the Shopify results warm; only drop the rows just uploaded.
+                        # An order has one row per SKU and unselected SKUs must stay
+                        results = st.session_state.shopify_master_results
+                        key_cols = [c for c in ("ORDER ID", "SKU") if c in results.columns and c in upload_df.columns]
+                        result_keys = pd.MultiIndex.from_frame(results[key_cols].astype(str))
+                        sent_keys = pd.MultiIndex.from_frame(upload_df[key_cols].astype(str))
+                        remaining = results[~result_keys.isin(sent_keys)]
+                        if remaining.empty:
+                            st.session_state.pop("shopify_master_results", None)
+                        else:
+                            st.session_state.shopify_master_results = remaining
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Upload Failed: {e}")
+
+
+@st.fragment
+def _skip_tab():
+    """Skip slot editor; reruns independently of the other sections."""
+    m_skip_oid = st.text_input("Enter Order ID to manage skips", key="skip_manual_oid").strip()
+    if st.button("Load Skip Slots"):
+        if not ORDER_ID_PATTERN.match(m_skip_oid):
+            st.error("Enter a valid Order ID, e.g. 123456 or #123456-WTD")
+        else:
+            try:
+                skip_orders = _cached_order_details(m_skip_oid)
+                # One slot for the loaded order, rather than a key per order ID
+                st.session_state.edit_slots = {"oid": m_skip_oid, "orders": skip_orders}
+                st.success(f"Loaded {len(skip_orders)} item(s)")
+            except Exception as e:
+                st.error(f"Order not found in DB: {e}")
+
+    edit_slots = st.session_state.get("edit_slots", {})
+    if m_skip_oid and edit_slots.get("oid") == m_skip_oid:
+        # Existing skip management UI...
+        orders_list = edit_slots["orders"]
+        # Select by position so lookup doesn't depend on comparing row dicts
+        selected_idx = st.selectbox(
+            "Select variant",
+            range(len(orders_list)),
+            format_func=lambda i: f"{orders_list[i].get('SKU')} - {orders_list[i].get('MEAL TYPE')}"
+        )
+        selected_row = orders_list[selected_idx]
+
+        with st.form("skip_mgmt_form"):
+            # All 20 slots in one editable row instead of 20 text inputs
+            skips_df = pd.DataFrame([{field: selected_row.get(field, "0") for field in SKIP_FIELDS}])
+            edited_skips = st.data_editor(
+                skips_df,
+                use_container_width=True,
+                hide_index=True,
+                key=f"skip_editor_{m_skip_oid}_{selected_idx}"
+            )
+            new_skips = {k: ("" if v is None else v) for k, v in edited_skips.iloc[0].items()}
+
+            if st.form_submit_button("Update Skips"):
+                try:
+                    sku_mapped = {SKIP_TO_SKU[k]: v for k, v in new_skips.items()}
+                    update_manual_fields_api(selected_row.get("ORDER ID"), None, sku_mapped, sku=selected_row.get('SKU'))
+                    _cached_order_details.clear()
+                    st.toast("Updated Successfully!", icon="✅")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed: {e}")
+
+
 def delivery_management_page():
     st.title("🚚 Order & Delivery Management")
-    
+
     # 0. Superuser Authentication (Shared across sections)
     is_superuser = st.session_state.get("is_superuser", False)
-    
+
     if not is_superuser:
         with st.expander("🔐 Admin Access (Login to Edit)", expanded=False):
             with st.form("admin_login"):
@@ -39,217 +329,15 @@ def delivery_management_page():
 
     # SECTION 1: DATABASE MANAGEMENT
     with tab1:
-        st.header("Search & Edit Database Records")
-        st.caption("Look up orders that have already been synced to the system.")
-        
-        search_id = st.text_input("Enter Order ID", placeholder="e.g. 123456789", key="db_search_input")
-        if st.button("🔍 Search Database", key="db_search_btn"):
-            if search_id:
-                try:
-                    orders = get_order_details(search_id)
-                    st.session_state.delivery_search_results = orders
-                    st.success(f"Found {len(orders)} record(s) for Order #{search_id}")
-                except Exception as e:
-                    st.error(f"Order not found in DB: {e}")
-                    st.session_state.pop("delivery_search_results", None)
-
-        if st.session_state.get("delivery_search_results"):
-            orders = st.session_state.delivery_search_results
-            first = orders[0]
-            st.subheader(f"Order #{first.get('ORDER ID')} - {first.get('NAME')}")
-            
-            # Simplified Item List
-            item_list = ", ".join([f"{o.get('SKU')} ({o.get('QUANTITY')})" for o in orders])
-            st.markdown(f"**Items Found:** {item_list}")
-
-            # Detailed Breakdown per item
-            for idx, order in enumerate(orders):
-                sku_val = order.get('SKU')
-                with st.expander(f"📦 SKU: {sku_val} | Status: {order.get('STATUS')}", expanded=(idx == 0)):
-                    
-                    if is_superuser:
-                        # EDITABLE FORM FOR ADMIN
-                        with st.form(key=f"edit_form_{search_id}_{idx}"):
-                            st.write("### ✏️ Edit Order Record")
-                            
-                            c1, c2 = st.columns(2)
-                            with c1:
-                                new_name = st.text_input("Customer Name", value=order.get('NAME', ''))
-                                new_email = st.text_input("Email", value=order.get('EMAIL', ''))
-                                new_phone = st.text_input("Phone", value=order.get('  PHONE', '')) # Note space in key
-                            with c2:
-                                new_unit = st.text_input("House/Unit No", value=order.get('HOUSE UNIT NO', ''))
-                                new_addr = st.text_input("Address Line 1", value=order.get('ADDRESS LINE 1', ''))
-                                new_city = st.text_input("City", value=order.get('CITY', ''))
-                            
-                            st.write("---")
-                            p1, p2, p3 = st.columns(3)
-                            with p1:
-                                new_prod = st.text_input("Product", value=order.get('PRODUCT', ''))
-                                new_code = st.text_input("Product Code", value=order.get('PRODUCT CODE', ''))
-                            with p2:
-                                new_meal = st.text_input("Meal Type", value=order.get('MEAL TYPE', ''))
-                                new_plan = st.text_input("Meal Plan", value=order.get('MEAL PLAN', ''))
-                            with p3:
-                                new_qty = st.text_input("Quantity", value=order.get('QUANTITY', ''))
-                                new_status = st.selectbox("Status", options=["WIP", "PAUSE", "TBS", "LAST DAY", "CANCELLED", "DELIVERED"], index=0 if order.get('STATUS') not in ["WIP", "PAUSE", "TBS", "LAST DAY", "CANCELLED", "DELIVERED"] else ["WIP", "PAUSE", "TBS", "LAST DAY", "CANCELLED", "DELIVERED"].index(order.get('STATUS')))
-
-                            st.write("---")
-                            t1, t2 = st.columns(2)
-                            with t1:
-                                new_del = st.text_input("Delivery Method", value=order.get('DELIVERY', ''))
-                                new_time = st.text_input("Delivery Time", value=order.get('DELIVERY TIME', ''))
-                            with t2:
-                                new_ts = st.text_area("TS Notes", value=order.get('TS NOTES', ''))
-                                new_driver = st.text_area("Driver Note", value=order.get('DRIVER NOTE', ''))
-
-                            if st.form_submit_button("✅ Save Changes to Database"):
-                                updates = {
-                                    "NAME": new_name, "EMAIL": new_email, "  PHONE": new_phone,
-                                    "HOUSE UNIT NO": new_unit, "ADDRESS LINE 1": new_addr, "CITY": new_city,
-                                    "PRODUCT": new_prod, "PRODUCT CODE": new_code, "MEAL TYPE": new_meal,
-                                    "MEAL PLAN": new_plan, "QUANTITY": new_qty, "STATUS": new_status,
-                                    "DELIVERY": new_del, "DELIVERY TIME": new_time,
-                                    "TS NOTES": new_ts, "DRIVER NOTE": new_driver
-                                }
-                                try:
-                                    update_master_row_api(order.get("ORDER ID"), updates, order)
-                                    st.success("Successfully updated record!")
-                                    time.sleep(1)
-                                    # Refresh data
-                                    st.session_state.delivery_search_results = get_order_details(search_id)
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Save failed: {e}")
-                    else:
-                        # READ-ONLY VIEW (Same as before)
-                        c1, c2 = st.columns(2)
-                        with c1:
-                            st.write(f"**👤 Customer:** {order.get('NAME')} ({order.get('EMAIL')})")
-                            st.write(f"**📍 Address:** {order.get('HOUSE UNIT NO')} {order.get('ADDRESS LINE 1')}, {order.get('CITY')}")
-                        with c2:
-                            st.write(f"**🍽️ Product:** {order.get('PRODUCT')} [{order.get('STATUS')}]")
-                            st.write(f"**⏰ Timing:** {order.get('DELIVERY')} ({order.get('DELIVERY TIME')})")
-                        
-                        st.info(f"**Driver Note:** {order.get('DRIVER NOTE', 'None')}")
-                        st.caption(f"**TS Notes:** {order.get('TS NOTES', 'None')}")
+        _db_tab(is_superuser)
 
     # SECTION 2: SHOPIFY INTEGRATION
     with tab2:
-        st.header("Shopify Live Search")
-        st.caption("Search directly in Shopify. Found orders can be uploaded to the Master Data.")
-        
-        search_q = st.text_input("Search Shopify (Name, ID, Email, Address, etc.)", placeholder="e.g. #1005 or customer name")
-        if st.button("🚀 Search Shopify"):
-            if search_q:
-                try:
-                    with st.spinner("Talking to Shopify..."):
-                        # 1. Fetch search results
-                        s_results = search_shopify_orders_api(search_q)
-                        if s_results.empty:
-                            st.warning("No matches found in Shopify.")
-                            st.session_state.pop("shopify_master_results", None)
-                        else:
-                            # 2. Apply same processing as Shopify Dashboard
-                            from utils.api import process_transformations_api
-                            processed, master = process_transformations_api(s_results)
-                            st.session_state.shopify_master_results = master
-                            st.success(f"Found and processed {len(master)} record(s) from Shopify")
-                except Exception as e:
-                    st.error(f"Shopify search failed: {e}")
-
-        if st.session_state.get("shopify_master_results") is not None:
-            sm_df = st.session_state.shopify_master_results.copy()
-            
-            # 1. Add Selection Column
-            if "Select" not in sm_df.columns:
-                sm_df.insert(0, "Select", False)
-
-            # Check for existing orders
-            try:
-                unique_ids = sm_df["ORDER ID"].unique().tolist()
-                existing_ids = set(check_existing_ids_api(unique_ids))
-                
-                if existing_ids:
-                    st.warning("⚠️ Some orders have been saved in master Database")
-                
-                def mark_existing(oid):
-                    str_oid = str(oid)
-                    if str_oid in existing_ids:
-                        return f"{str_oid} ✅ (On DB)"
-                    return str_oid
-                sm_df["ORDER ID"] = sm_df["ORDER ID"].apply(mark_existing)
-            except Exception as e:
-                st.warning(f"Could not check existing orders: {e}")
-
-            st.write("### Processed Results (Preview & Edit)")
-            st.info("✏️ Check/Uncheck rows to select which ones to upload. You can also edit values directly.")
-            
-            # Editable Data View
-            edited_s_df = st.data_editor(
-                sm_df,
-                use_container_width=True,
-                hide_index=True,
-                num_rows="fixed",
-                key="shopify_sync_editor"
-            )
-            
-            if st.button("⬆️ Upload Selected to Master Database"):
-                # Filter for selected rows
-                selected_rows = edited_s_df[edited_s_df["Select"] == True].copy()
-                
-                if selected_rows.empty:
-                    st.warning("No records selected. Please check at least one row.")
-                else:
-                    try:
-                        with st.spinner(f"Uploading {len(selected_rows)} record(s)..."):
-                            # Remove the 'Select' column before sending to API
-                            upload_df = selected_rows.drop(columns=["Select"])
-                            
-                            # Sanitize for JSON (convert NaNs to None)
-                            upload_data = upload_df.where(pd.notnull(upload_df), None).to_dict(orient="records")
-                            
-                            res = upload_master_data_api(upload_data)
-                            st.success(f"Upload Complete! New: {res.get('inserted')}, Updated: {res.get('updated')}")
-                            time.sleep(1)
-                            st.session_state.pop("shopify_master_results", None)
-                            st.rerun()
-                    except Exception as e:
-                        st.error(f"Upload Failed: {e}")
+        _shopify_tab()
 
     st.divider()
 
     # SECTION 3: SKIP MANAGEMENT (Independent or linked?)
     st.header("⏭️ Skip Slots Management")
     with st.expander("Manage Skip History (Date Slots)"):
-        m_skip_oid = st.text_input("Enter Order ID to manage skips", key="skip_manual_oid")
-        if st.button("Load Skip Slots"):
-            if m_skip_oid:
-                try:
-                    skip_orders = get_order_details(m_skip_oid)
-                    st.session_state[f"edit_slots_{m_skip_oid}"] = skip_orders
-                    st.success(f"Loaded {len(skip_orders)} item(s)")
-                except Exception as e:
-                    st.error(f"Order not found in DB: {e}")
-
-        if f"edit_slots_{m_skip_oid}" in st.session_state:
-            # Existing skip management UI...
-            orders_list = st.session_state[f"edit_slots_{m_skip_oid}"]
-            selected_row = st.selectbox("Select variant", orders_list, format_func=lambda o: f"{o.get('SKU')} - {o.get('MEAL TYPE')}")
-            
-            with st.form("skip_mgmt_form"):
-                cols = st.columns(5)
-                new_skips = {}
-                for i in range(1, 21):
-                    field = f"SKIP{i}"
-                    with cols[(i-1)%5]:
-                        new_skips[field] = st.text_input(field, value=selected_row.get(field, "0"))
-                
-                if st.form_submit_button("Update Skips"):
-                    try:
-                        sku_mapped = {k.replace("SKIP", "SKU"): v for k, v in new_skips.items()}
-                        update_manual_fields_api(selected_row.get("ORDER ID"), None, sku_mapped, sku=selected_row.get('SKU'))
-                        st.success("Updated Successfully!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Failed: {e}")
+        _skip_tab()
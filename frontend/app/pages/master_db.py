@@ -1,14 +1,277 @@
 import streamlit as st
-from utils.api import update_master_row_api, delete_master_row_api, sanitize_df, get_auth
-import requests
+from utils.api import update_master_rows_bulk_api, delete_master_row_api, sanitize_df, search_blob, get_auth, get_api_client
+import orjson
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
 import time
+from math import ceil
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 SUPERUSER_USERNAME = os.getenv("SUPERUSER_USERNAME", "admin")
 SUPERUSER_PASSWORD = os.getenv("SUPERUSER_PASSWORD", "admin")
 
+# Rows sent to the browser per page of the bulk editor
+PAGE_SIZE = 500
+
+# Columns matched by the Search & Delete tab
+DELETE_SEARCH_COLS = ('NAME', 'EMAIL', 'ORDER ID', 'PRODUCT', 'SKU')
+
+
+@st.cache_data(ttl=60, show_spinner="Loading master DB...")
+def _load_master(only_active):
+    """Fetch /master-data once per minute per filter, already sanitized."""
+    params = {"only_active": "true" if only_active else "false", "columnar": "true"}
+    resp = get_api_client().get(f"{BACKEND_URL}/master-data", params=params, auth=get_auth())
+    resp.raise_for_status()
+    # orjson parses the (large) payload several times faster than resp.json()
+    payload = orjson.loads(resp.content)
+    return sanitize_df(pd.DataFrame(payload["data"], columns=payload["columns"]))
+
+
+def _store_master(df):
+    """Keep the loaded table in session_state as Arrow IPC bytes, far smaller than the object-dtype frame."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    st.session_state.db_master = sink.getvalue().to_pybytes()
+    # Unsaved bulk edits refer to the previous table's rows; a new generation also
+    # gives the editors new keys so their old edited_rows are not merged again
+    st.session_state.master_edits = {}
+    st.session_state.db_master_gen = st.session_state.get("db_master_gen", 0) + 1
+    # Search text is built once per load and shared by both tabs
+    st.session_state.db_master_search = {
+        "all": pa.array(search_blob(df), type=pa.string()),
+        "delete": pa.array(search_blob(df, DELETE_SEARCH_COLS), type=pa.string()),
+    }
+
+
+def _get_master():
+    """The table stored by _store_master as a pyarrow Table, or None if nothing is loaded.
+
+    Reading the IPC stream references the stored bytes without copying, so this is
+    cheap on every rerun; only the rows actually shown are converted to pandas.
+    """
+    data = st.session_state.get("db_master")
+    if data is None:
+        return None
+    return pa.ipc.open_stream(data).read_all()
+
+
+def _master_rows(table, positions):
+    """Rows of the stored table at the given positions, as a DataFrame indexed by those positions."""
+    positions = np.asarray(positions, dtype=np.int64)
+    df = table.take(pa.array(positions)).to_pandas()
+    df.index = pd.Index(positions)
+    return df
+
+
+def _search_mask(kind, query):
+    """Boolean row mask of the stored table for a literal, case-insensitive query."""
+    blob = st.session_state.db_master_search[kind]
+    return pc.match_substring(blob, query.lower()).to_numpy(zero_copy_only=False)
+
+
+@st.fragment
+def _bulk_edit_tab(is_superuser):
+    """View & Bulk Edit tab; reruns independently of the delete tab."""
+    only_active = st.toggle(
+        "Show Active Orders Only",
+        value=True,
+        help="Show WIP, PAUSE, TBS, LAST DAY. Off to see full history.",
+        key="bulk_edit_toggle"
+    )
+
+    force_refresh = st.checkbox("Force refresh", help="Ignore data cached in the last minute and reload from the database")
+
+    if st.button("🔄 Refresh Master View"):
+        try:
+            if force_refresh:
+                _load_master.clear()
+            _store_master(_load_master(only_active))
+            # Full rerun so the delete tab sees the new table too
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error fetching data: {e}")
+
+    table = _get_master()
+    if table is not None:
+        
+        # Sub-filter (applied on submit only)
+        with st.form("master_filter_form", clear_on_submit=False):
+            search = st.text_input("Quick filter (Bulk Edit View)", placeholder="Search name, ID, city...")
+            st.form_submit_button("Apply Filter")
+        positions = np.arange(table.num_rows)
+        # Single characters match nearly everything; skip the scan
+        search = search.strip()
+        if len(search) >= 2:
+            positions = _search_mask("all", search).nonzero()[0]
+        elif search:
+            st.caption("Type at least 2 characters to filter.")
+        
+        st.metric("Records Found", len(positions))
+
+        # Only the visible window is converted and sent to the browser
+        total_pages = max(1, ceil(len(positions) / PAGE_SIZE))
+        page = 1
+        if total_pages > 1:
+            page = int(st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1, key="master_page"))
+        start = (page - 1) * PAGE_SIZE
+        df_view = _master_rows(table, positions[start : start + PAGE_SIZE])
+        st.caption(f"Showing rows {start + 1 if len(df_view) else 0}-{start + len(df_view)} of {len(positions)}")
+        
+        if is_superuser:
+            st.info("✏️ **Bulk Edit Mode:** Values changed in the editor are kept across pages until saved back to the DB.")
+            msg = st.session_state.pop("master_save_msg", None)
+            if msg:
+                getattr(st, msg[0])(msg[1])
+
+            # Edits from every page, keyed by the stored table's index; re-applied to this page
+            edits = st.session_state.setdefault("master_edits", {})
+            page_edits = {idx: changes for idx, changes in edits.items() if idx in df_view.index}
+            if page_edits:
+                df_view = df_view.copy()
+                for idx, changes in page_edits.items():
+                    for col, val in changes.items():
+                        if col in df_view.columns:
+                            df_view.at[idx, col] = val
+
+            # edited_rows are positions in this view: one editor per loaded table, filter and page
+            editor_key = f"master_bulk_editor_{st.session_state.get('db_master_gen', 0)}_{search}_{page}"
+            st.data_editor(df_view, use_container_width=True, hide_index=True, key=editor_key)
+
+            # Merge this page's edits into the cross-page map
+            for pos, changes in st.session_state[editor_key].get("edited_rows", {}).items():
+                edits.setdefault(int(df_view.index[int(pos)]), {}).update(changes)
+            if edits:
+                st.caption(f"{len(edits)} edited row(s) not saved yet.")
+            
+            if st.button("💾 Save Changes to DB"):
+                if edits:
+                    success_count = 0
+                    try:
+                        # Fingerprints (values as loaded) for all edited rows, stringified in one pass
+                        originals = _master_rows(table, list(edits))
+                        originals = originals.astype(object).where(originals.notna(), "").astype(str)
+
+                        rows = []
+                        for original_row_dict, new_values in zip(originals.to_dict(orient="records"), edits.values()):
+                            oid = original_row_dict.get("ORDER ID")
+                            if oid:
+                                rows.append({"order_id": oid, "updates": new_values, "original_row": original_row_dict})
+                        
+                        # All edits go to the backend in a single request
+                        conflicts = []
+                        if rows:
+                            res = update_master_rows_bulk_api(rows)
+                            success_count = res.get("updated", 0)
+                            conflicts = res.get("conflicts", [])
+                                
+                        if success_count > 0:
+                            # Reload so the view shows what is now stored; this also clears the edits
+                            _load_master.clear()
+                            _store_master(_load_master(only_active))
+                            if conflicts:
+                                st.session_state.master_save_msg = (
+                                    "error",
+                                    f"Updated {success_count} rows. Not saved, data had changed (re-apply on the refreshed view): {', '.join(map(str, conflicts))}"
+                                )
+                            else:
+                                st.session_state.master_save_msg = ("success", f"Successfully updated {success_count} rows!")
+                            st.rerun()
+                        elif conflicts:
+                            # Nothing written; keep the edits so they can be reviewed
+                            st.error(f"Not saved, data may have changed (refresh and retry): {', '.join(map(str, conflicts))}")
+                    except Exception as e:
+                        st.error(f"Update failed: {e}")
+        else:
+            st.dataframe(df_view, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _delete_tab(is_superuser):
+    """Search & Delete tab; reruns independently of the bulk editor."""
+    st.header("Search and Remove Records")
+    st.caption("Identify a specific record and delete it permanently from the master database.")
+    
+    # We need data to search through
+    if st.session_state.get('db_master') is None:
+        st.info("Please load 'Refresh Master View' in the first tab to search here, or click below.")
+        if st.button("Load Data for Deletion"):
+            try:
+                _store_master(_load_master(False))
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error: {e}")
+    
+    table = _get_master()
+    if table is not None:
+        
+        q = st.text_input("🔍 Search Record to Delete", placeholder="Enter Name, ID, Email, or Product...").strip()
+        if len(q) == 1:
+            st.caption("Type at least 2 characters to search.")
+        
+        if len(q) >= 2:
+            # search by name, email, product, order id, SKU (DELETE_SEARCH_COLS)
+            # Reuse the match positions while the query and loaded table are unchanged,
+            # so picking a row or typing the confirmation doesn't search again
+            data = st.session_state.db_master
+            last = st.session_state.get("delete_search")
+            if last and last[0] == q and last[1] is data:
+                positions = last[2]
+            else:
+                positions = _search_mask("delete", q).nonzero()[0]
+                st.session_state.delete_search = (q, data, positions)
+            matches = _master_rows(table, positions)
+            
+            if matches.empty:
+                st.warning("No matching records found.")
+            else:
+                st.write(f"### Found {len(matches)} potential match(es)")
+                st.dataframe(matches, use_container_width=True, hide_index=True)
+                
+                if is_superuser:
+                    st.write("---")
+                    st.subheader("Confirm Deletion")
+                    
+                    # Use a selectbox to pick the exact record to delete from the search results
+                    # Create a descriptive label for each row
+                    def record_label(row):
+                        return f"#{row.get('ORDER ID')} | {row.get('NAME')} | {row.get('PRODUCT')} ({row.get('SKU')})"
+                    
+                    # Options are positions; only the chosen row is turned into a dict
+                    sel_pos = st.selectbox(
+                        "Select the exact row to delete:",
+                        range(len(matches)),
+                        format_func=lambda i: record_label(matches.iloc[i])
+                    )
+                    row_to_delete = matches.iloc[sel_pos].to_dict() if sel_pos is not None else None
+                    
+                    if row_to_delete:
+                        st.warning(f"Are you sure you want to delete: **{record_label(row_to_delete)}**?")
+                        confirm_id = st.text_input("To confirm, type the Order ID again:", placeholder=row_to_delete.get('ORDER ID'))
+                        
+                        if st.button("🗑️ PERMANENTLY DELETE RECORD", type="primary"):
+                            if confirm_id == str(row_to_delete.get('ORDER ID')):
+                                try:
+                                    res = delete_master_row_api(row_to_delete.get("ORDER ID"), row_to_delete)
+                                    _load_master.clear()
+                                    st.success(f"Successfully deleted {res.get('deleted')} record(s).")
+                                    time.sleep(1.5)
+                                    # Clear state and rerun
+                                    st.session_state.db_master = None
+                                    st.rerun()
+                                except Exception as e:
+                                    st.error(f"Deletion failed: {e}")
+                            else:
+                                st.error("Confirmation ID does not match.")
+                else:
+                    st.info("🔓 Admin Login required to delete records.")
+
+
 def master_database_page():
     st.title("🗄️ Master Database")
     
@@ -32,137 +295,8 @@ def master_database_page():
 
     # --- TAB 1: VIEW & BULK EDIT ---
     with tab1:
-        only_active = st.toggle(
-            "Show Active Orders Only",
-            value=True,
-            help="Show WIP, PAUSE, TBS, LAST DAY. Off to see full history.",
-            key="bulk_edit_toggle"
-        )
-
-        if st.button("🔄 Refresh Master View"):
-            try:
-                params = {"only_active": "true" if only_active else "false"}
-                resp = requests.get(f"{BACKEND_URL}/master-data", params=params, auth=get_auth())
-                resp.raise_for_status()
-                st.session_state.db_master = sanitize_df(pd.DataFrame(resp.json()))
-            except Exception as e:
-                st.error(f"Error fetching data: {e}")
-
-        if st.session_state.get('db_master') is not None:
-            df = st.session_state.db_master
-            
-            # Sub-filter
-            search = st.text_input("Quick filter (Bulk Edit View)", placeholder="Search name, ID, city...")
-            df_filtered = df
-            if search:
-                mask = df.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-                df_filtered = df[mask]
-            
-            st.metric("Records Found", len(df_filtered))
-            
-            if is_superuser:
-                st.info("✏️ **Bulk Edit Mode:** Values changed in the editor can be saved back to the DB.")
-                edited_df = st.data_editor(df_filtered, use_container_width=True, hide_index=True, key="master_bulk_editor_key")
-                
-                if st.button("💾 Save Changes to DB"):
-                    changes = st.session_state.get("master_bulk_editor_key")
-                    if changes:
-                        edits = changes.get("edited_rows", {})
-                        success_count = 0
-                        try:
-                            # Note: edited_rows uses integer index from the displayed dataframe
-                            for row_idx_str, new_values in edits.items():
-                                row_idx = int(row_idx_str)
-                                original_series = df_filtered.iloc[row_idx]
-                                oid = original_series.get("ORDER ID")
-                                
-                                # Fingerprint
-                                original_row_dict = {
-                                    k: str(v) if v is not None else "" 
-                                    for k, v in original_series.to_dict().items()
-                                }
-                                
-                                if oid:
-                                    update_master_row_api(oid, new_values, original_row_dict)
-                                    success_count += 1
-                                    
-                            if success_count > 0:
-                                st.success(f"Successfully updated {success_count} rows!")
-                                time.sleep(1)
-                                st.rerun()
-                        except Exception as e:
-                            st.error(f"Update failed: {e}")
-            else:
-                st.dataframe(df_filtered, use_container_width=True, hide_index=True)
+        _bulk_edit_tab(is_superuser)
 
     # --- TAB 2: SEARCH & DELETE ---
     with tab2:
-        st.header("Search and Remove Records")
-        st.caption("Identify a specific record and delete it permanently from the master database.")
-        
-        # We need data to search through
-        if st.session_state.get('db_master') is None:
-            st.info("Please load 'Refresh Master View' in the first tab to search here, or click below.")
-            if st.button("Load Data for Deletion"):
-                try:
-                    resp = requests.get(f"{BACKEND_URL}/master-data", params={"only_active": "false"}, auth=get_auth())
-                    resp.raise_for_status()
-                    st.session_state.db_master = sanitize_df(pd.DataFrame(resp.json()))
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {e}")
-        
-        if st.session_state.get('db_master') is not None:
-            df_full = st.session_state.db_master
-            
-            q = st.text_input("🔍 Search Record to Delete", placeholder="Enter Name, ID, Email, or Product...")
-            
-            if q:
-                # search by name, email, product, order id
-                # We'll search across all columns for simplicity, or specifically targeted ones
-                cols_to_search = ['NAME', 'EMAIL', 'ORDER ID', 'PRODUCT', 'SKU']
-                cols_to_search = [c for c in cols_to_search if c in df_full.columns]
-                
-                mask = df_full[cols_to_search].astype(str).apply(lambda x: x.str.contains(q, case=False, na=False)).any(axis=1)
-                matches = df_full[mask]
-                
-                if matches.empty:
-                    st.warning("No matching records found.")
-                else:
-                    st.write(f"### Found {len(matches)} potential match(es)")
-                    st.dataframe(matches, use_container_width=True, hide_index=True)
-                    
-                    if is_superuser:
-                        st.write("---")
-                        st.subheader("Confirm Deletion")
-                        
-                        # Use a selectbox to pick the exact record to delete from the search results
-                        # Create a descriptive label for each row
-                        def record_label(row):
-                            return f"#{row.get('ORDER ID')} | {row.get('NAME')} | {row.get('PRODUCT')} ({row.get('SKU')})"
-                        
-                        row_to_delete = st.selectbox(
-                            "Select the exact row to delete:",
-                            matches.to_dict(orient="records"),
-                            format_func=record_label
-                        )
-                        
-                        if row_to_delete:
-                            st.warning(f"Are you sure you want to delete: **{record_label(row_to_delete)}**?")
-                            confirm_id = st.text_input("To confirm, type the Order ID again:", placeholder=row_to_delete.get('ORDER ID'))
-                            
-                            if st.button("🗑️ PERMANENTLY DELETE RECORD", type="primary"):
-                                if confirm_id == str(row_to_delete.get('ORDER ID')):
-                                    try:
-                                        res = delete_master_row_api(row_to_delete.get("ORDER ID"), row_to_delete)
-                                        st.success(f"Successfully deleted {res.get('deleted')} record(s).")
-                                        time.sleep(1.5)
-                                        # Clear state and rerun
-                                        st.session_state.db_master = None
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Deletion failed: {e}")
-                                else:
-                                    st.error("Confirmation ID does not match.")
-                    else:
-                        st.info("🔓 Admin Login required to delete records.")
+        _delete_tab(is_superuser)
@@ -1,14 +1,28 @@
 import streamlit as st
-import requests
+import orjson
 import pandas as pd
 import os
-from utils.api import upload_master_data_api, get_auth
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.api import upload_master_data_api, search_blob, get_auth, get_api_client
 import logging
 
 logger = logging.getLogger(__name__)
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+# Sheets per /fetch-seller-ongoing-batch call; the backend reads each batch in parallel
+SHEET_BATCH_SIZE = 8
+# Batch requests in flight at once over the shared session's connection pool
+SHEET_BATCH_WORKERS = 4
+
+
+def _fetch_sheet_batch(batch, auth, session):
+    """Raw 'Ongoing' rows of a batch of seller sheets (auth and session passed in: runs in a worker thread)."""
+    r = session.post(f"{BACKEND_URL}/fetch-seller-ongoing-batch", json={"sids": batch}, auth=auth)
+    r.raise_for_status()
+    return orjson.loads(r.content)
+
+
 def seller_data_page():
     st.title("📑 Seller Data (Aggregated)")
     st.markdown("Fetch aggregated 'Ongoing' orders from multiple Seller Sheets and upload to the database.")
@@ -22,37 +36,47 @@ def seller_data_page():
             with st.status("🚀 Aggregating Seller Data...", expanded=True) as status:
                 # 1. Get the list of sheet URLs
                 status.write("Obtaining seller sheet URLs...")
-                sheet_ids = requests.get(f"{BACKEND_URL}/seller-sheet-urls", auth=get_auth())
+                sheet_ids = get_api_client().get(f"{BACKEND_URL}/seller-sheet-urls", auth=get_auth())
                 sheet_ids.raise_for_status()
                 sheet_ids = sheet_ids.json()
                 total_sheets = len(sheet_ids)
                 
-                all_raw_rows = []
-                
                 # 2. Extract IDs and Prepare Progress
                 progress_bar = st.progress(0)
                 
-                # 3. Iterate through sheets and show progress
-                for i, sid in enumerate(sheet_ids):
-                    status.update(label=f"🔄 Processing sheet {i+1} of {total_sheets}...", state="running")
-                    try:
-                        # We call the single-sheet worker
-                        r = requests.get(f"{BACKEND_URL}/fetch-single-seller-ongoing", params={"sid": sid}, auth=get_auth())
-                        if r.status_code == 200:
-                            rows = r.json()
-                            all_raw_rows.extend(rows)
-                    except Exception as sheet_e:
-                        status.write(f"⚠️ Warning: Failed to fetch sheet {i+1}: {sheet_e}")
-                    
-                    progress_bar.progress((i + 1) / total_sheets)
+                # 3. Fetch sheet batches concurrently; progress advances as each one lands
+                batches = [sheet_ids[i : i + SHEET_BATCH_SIZE] for i in range(0, total_sheets, SHEET_BATCH_SIZE)]
+                batch_rows = [[] for _ in batches]
+                auth = get_auth()
+                client = get_api_client()
+                status.update(label=f"🔄 Processing {total_sheets} sheets...", state="running")
+                with ThreadPoolExecutor(max_workers=SHEET_BATCH_WORKERS) as executor:
+                    futures = {executor.submit(_fetch_sheet_batch, batch, auth, client): n for n, batch in enumerate(batches)}
+                    for done, future in enumerate(as_completed(futures), 1):
+                        n = futures[future]
+                        first = n * SHEET_BATCH_SIZE + 1
+                        last = first + len(batches[n]) - 1
+                        try:
+                            batch_rows[n] = future.result()
+                        except Exception as sheet_e:
+                            status.write(f"⚠️ Warning: Failed to fetch sheets {first}-{last}: {sheet_e}")
+                        progress_bar.progress(done / len(batches))
+
+                # Keep the configured sheet order regardless of completion order
+                all_raw_rows = [row for rows in batch_rows for row in rows]
 
                 status.update(label="✨ Finalizing and formatting data...", state="running")
                 
                 # 4. Finalize with numbering and transformations
                 if all_raw_rows:
-                    resp_final = requests.post(f"{BACKEND_URL}/finalize-seller-data", json=all_raw_rows, auth=get_auth())
+                    resp_final = get_api_client().post(
+                        f"{BACKEND_URL}/finalize-seller-data",
+                        data=orjson.dumps(all_raw_rows),
+                        headers={"Content-Type": "application/json"},
+                        auth=get_auth()
+                    )
                     resp_final.raise_for_status()
-                    final_data = resp_final.json()
+                    final_data = orjson.loads(resp_final.content)
                     
                     st.session_state.seller_sheet_data = pd.DataFrame(final_data)
                     status.update(label=f"✅ Successfully aggregated {len(final_data)} records!", state="complete")
@@ -70,57 +94,61 @@ def seller_data_page():
         df_full = st.session_state.seller_sheet_data
         st.header("Preview Aggregated Data")
         
-        search_seller = st.text_input(
-            "🔍 Search seller data",
-            placeholder="Search across all columns...",
-            key="seller_data_search",
-        )
+        # Applied on submit only
+        with st.form("seller_filter_form", clear_on_submit=False):
+            search_seller = st.text_input(
+                "🔍 Search seller data",
+                placeholder="Search across all columns...",
+                key="seller_data_search",
+            )
+            st.form_submit_button("Apply Filter")
         df = df_full
-        if search_seller:
-            mask = df_full.astype(str).apply(
-                lambda x: x.str.contains(search_seller, case=False, na=False)
-            ).any(axis=1)
+        # Single characters match nearly everything; skip the scan
+        search_seller = search_seller.strip()
+        if len(search_seller) == 1:
+            st.caption("Type at least 2 characters to filter.")
+        elif search_seller:
+            mask = search_blob(df_full).str.contains(search_seller.lower(), regex=False)
             df = df_full[mask]
             st.caption(f"Showing {len(df)} of {len(df_full)} row(s) matching your search.")
         st.dataframe(df, use_container_width=True, hide_index=True)
         
         if st.button("🚀 Upload to Database", help="Insert records into PostgreSQL"):
+            sent = 0
             try:
-                df_clean = df_full.copy()
-                df_clean = df_clean.where(pd.notnull(df_clean), None)
-                
-                for col in df_clean.select_dtypes(include=['datetime', 'datetimetz']).columns:
-                    df_clean[col] = df_clean[col].astype(str).replace('NaT', None)
-                    
-                data = df_clean.to_dict(orient="records")
+                # Only datetime columns need converting; strftime leaves NaT as
+                # NaN, which the JSON serialization turns into "" like any null
+                dt_cols = df_full.select_dtypes(include=['datetime', 'datetimetz']).columns
+                df_clean = df_full
+                if len(dt_cols):
+                    df_clean = df_full.assign(**{
+                        col: df_full[col].dt.strftime('%Y-%m-%d %H:%M:%S') for col in dt_cols
+                    })
                 
-                # Chunked Upload with Progress Bar
-                chunk_size = 50
-                total_rows = len(data)
+                # Chunked Upload with Progress Bar (each chunk is committed on its own)
+                chunk_size = 1000
+                total_rows = len(df_clean)
                 
                 progress_container = st.empty()
                 status_text = st.empty()
                 
-                total_inserted = 0
-                total_updated = 0
-                total_skipped = 0
+                totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
                 
                 for i in range(0, total_rows, chunk_size):
-                    chunk = data[i : i + chunk_size]
-                    percent = min(100, int((i + len(chunk)) / total_rows * 100))
-                    
-                    status_text.markdown(f"**Uploading:** {percent}% ({i + len(chunk)}/{total_rows} records)")
-                    progress_container.progress(percent / 100)
-                    
+                    chunk = df_clean.iloc[i : i + chunk_size]
                     res = upload_master_data_api(chunk, table_name="seller-data")
+                    for k in totals:
+                        totals[k] += res.get(k, 0)
+                    sent = i + len(chunk)
                     
-                    total_inserted += res.get('inserted', 0)
-                    total_updated += res.get('updated', 0)
-                    total_skipped += res.get('skipped', 0)
+                    status_text.markdown(f"**Uploading:** {sent}/{total_rows} records")
+                    progress_container.progress(sent / total_rows)
                 
                 progress_container.empty()
                 status_text.empty()
-                st.success(f"✅ Upload Complete! New: {total_inserted}, Updated: {total_updated}, Skipped: {total_skipped}")
+                st.success(f"✅ Upload Complete! New: {totals['inserted']}, Updated: {totals['updated']}, Skipped: {totals['skipped']}")
                 
             except Exception as e:
                 st.error(f"Upload Failed: {e}")
+                if sent:
+                    st.info(f"The first {sent} records were saved before the failure.")
@@ -1,39 +1,54 @@
 import streamlit as st
+import orjson
 import requests
 import pandas as pd
 import os
-from utils.api import final_pivot_df, sanitize_df, get_auth
+from utils.api import final_pivot_df, sanitize_df, get_auth, get_api_client
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _master_rows(table_name, only_active, seller, auth):
+    """/master-data rows of a table (one seller's, if given) as a DataFrame, cached for five minutes."""
+    resp = get_api_client().get(
+        f"{BACKEND_URL}/master-data",
+        params={"table_name": table_name, "only_active": "true" if only_active else "false", "seller": seller, "columnar": "true"},
+        auth=auth
+    )
+    resp.raise_for_status()
+    payload = orjson.loads(resp.content)
+    return pd.DataFrame(payload["data"], columns=payload["columns"])
+
+
+def _master_rows_or_empty(table_name, only_active, seller):
+    """_master_rows, or an empty frame when the backend answers with an error (not cached)."""
+    try:
+        return _master_rows(table_name, only_active, seller, get_auth())
+    except requests.HTTPError:
+        return pd.DataFrame()
+
+
 def seller_page(seller_name, seller_code):
     st.title(f"👤 Seller Dashboard: {seller_name}")
     st.caption(f"Seller Code: {seller_code}")
     
+    force_refresh = st.checkbox("Force refresh", key=f"force_{seller_code}", help="Ignore tables cached in the last five minutes")
+
     # Load data for this seller from DB
     if st.button("🔄 Sync Seller Data", key=f"btn_{seller_code}"):
         try:
             with st.spinner(f"Fetching data for {seller_name}..."):
-                # 1. Fetch from historical-data (Shopify Master)
-                resp_h = requests.get(
-                    f"{BACKEND_URL}/master-data", 
-                    params={"table_name": "historical-data", "only_active": "true"}, 
-                    auth=get_auth()
-                )
-                data_h = resp_h.json() if resp_h.status_code == 200 else []
+                if force_refresh:
+                    _master_rows.clear()
+
+                # 1. Fetch from historical-data (Shopify Master), only this seller's rows
+                df_h = _master_rows_or_empty("historical-data", True, str(seller_code))
                 
                 # 2. Fetch from seller-data (Manual Aggregations)
-                # Note: seller-data might not have 'STATUS' column, so only_active=false
-                resp_s = requests.get(
-                    f"{BACKEND_URL}/master-data", 
-                    params={"table_name": "seller-data", "only_active": "false"}, 
-                    auth=get_auth()
-                )
-                data_s = resp_s.json() if resp_s.status_code == 200 else []
-                
-                # Combine results
-                df_h = pd.DataFrame(data_h)
-                df_s = pd.DataFrame(data_s)
+                # Note: seller-data might not have 'STATUS' column, so only_active=false.
+                # Fetched whole (and shared by all sellers): the latest DATE is table-wide.
+                df_s = _master_rows_or_empty("seller-data", False, None)
 
                 # Filter df_s (Manual Aggregations) to only show the LATEST date
                 if not df_s.empty and "DATE" in df_s.columns:
@@ -45,7 +60,12 @@ def seller_page(seller_name, seller_code):
                         st.info(f"📅 Showing Manual Aggregations for the latest date: {latest_date.strftime('%Y-%m-%d')}")
                     df_s = df_s.drop(columns=['temp_date'])
 
-                df_combined = pd.concat([df_h, df_s], ignore_index=True)
+                # Align both frames on one column list (historical-data order first) and stack once
+                cols = df_h.columns.union(df_s.columns, sort=False)
+                df_combined = pd.concat(
+                    [df_h.reindex(columns=cols), df_s.reindex(columns=cols)],
+                    ignore_index=True, sort=False
+                )
                 
                 df = sanitize_df(df_combined)
                 
@@ -53,22 +73,29 @@ def seller_page(seller_name, seller_code):
 
                 # Filter for this seller
                 if 'SELLER' in df.columns:
-                    # Clean the SELLER column to ensure match works
-                    df['SELLER'] = df['SELLER'].astype(str).str.strip()
-                    st.session_state[f"seller_{seller_code}"] = df[df['SELLER'] == str(seller_code)]
+                    # Strip SELLER so the match works (sanitize_df already stringified it);
+                    # compare on the raw array rather than an aligned Series
+                    is_seller = df['SELLER'].str.strip().to_numpy() == str(seller_code)
+                    # Arrow-backed strings: the pivots' strip/compare/groupby run on Arrow kernels
+                    sdf = df.loc[is_seller].astype("string[pyarrow]")
+                    # Pivot once per sync; widget reruns only redraw the stored tables
+                    st.session_state[f"pivots_{seller_code}"] = {
+                        "LUNCH": final_pivot_df(sdf, "LUNCH"),
+                        "DINNER": final_pivot_df(sdf, "DINNER"),
+                    }
                 else:
                     st.error("SELLER column missing in database tables!")
         except Exception as e:
             st.error(f"Error: {e}")
-    data_key = f"seller_{seller_code}"
-    if st.session_state.get(data_key) is not None:
-        sdf = st.session_state[data_key]
+    pivots_key = f"pivots_{seller_code}"
+    if st.session_state.get(pivots_key) is not None:
+        pivots = st.session_state[pivots_key]
         
         tab1, tab2 = st.tabs(["🍱 Lunch Section", "🍽️ Dinner Section"])
         
         with tab1:
             st.subheader("Lunch Summary")
-            lunch_df = final_pivot_df(sdf, "LUNCH")
+            lunch_df = pivots["LUNCH"]
             if not lunch_df.empty:
                 st.metric("Total Lunch Items", int(lunch_df['QUANTITY'].sum()))
                 st.dataframe(lunch_df, use_container_width=True, hide_index=True)
@@ -77,7 +104,7 @@ def seller_page(seller_name, seller_code):
                 
         with tab2:
             st.subheader("Dinner Summary")
-            dinner_df = final_pivot_df(sdf, "DINNER")
+            dinner_df = pivots["DINNER"]
             if not dinner_df.empty:
                 st.metric("Total Dinner Items", int(dinner_df['QUANTITY'].sum()))
                 st.dataframe(dinner_df, use_container_width=True, hide_index=True)
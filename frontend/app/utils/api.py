@@ -1,7 +1,13 @@
+import http.cookiejar
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import os
+import gzip
+import json
 import numpy as np
+import orjson
 import streamlit as st
 import logging
 
@@ -14,6 +20,24 @@ BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 SUPERUSER_USERNAME = os.getenv("SUPERUSER_USERNAME", "admin")
 SUPERUSER_PASSWORD = os.getenv("SUPERUSER_PASSWORD", "admin")
 
+@st.cache_resource
+def get_api_client():
+    """Shared HTTP session so backend calls reuse pooled keep-alive connections.
+
+    Credentials are passed per request; the session is shared by all users, so it
+    keeps no cookies (one user's response must not set cookies sent for another).
+    Idempotent requests (GET etc.) are retried on gateway errors; POSTs are not.
+    Worker threads have no script context: get the session on the script thread
+    and pass it in.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 def get_auth():
     """Get authentication credentials from session state or environment."""
     # Try to get from session state (set during login)
@@ -37,35 +61,62 @@ def clean_dict(d):
         else:
             new_d[k] = str(v)
     return new_d
+def records_to_json(df):
+    """Serialize a DataFrame to a JSON array of records, cleaned like clean_dict (NaN/inf -> "", values stringified)."""
+    # One object copy; inf is blanked by the same mask as NaN instead of a separate replace pass
+    obj = df.astype(object)
+    blank = obj.isna() | obj.isin([np.inf, -np.inf])
+    return obj.mask(blank, "").astype(str).to_json(orient="records", force_ascii=False)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def search_blob(df, cols=None):
+    """One lowercased string per row joining the given columns (all by default), for single-pass substring search."""
+    cols = [c for c in (cols or df.columns) if c in df.columns]
+    if not cols:
+        return pd.Series("", index=df.index)
+    text = df[cols].astype(object).where(df[cols].notna(), "").astype(str)
+    blob = text[cols[0]]
+    for col in cols[1:]:
+        # Unit separator keeps matches from spanning two columns
+        blob = blob + "\x1f" + text[col]
+    return blob.str.lower()
+
 def check_existing_ids_api(order_ids, table_name="historical-data"):
     if not order_ids:
         return []
     params = {"table_name": table_name, "order_ids": order_ids}
-    resp = requests.get(f"{BACKEND_URL}/check-duplicate-ids", params=params, auth=get_auth())
+    resp = get_api_client().get(f"{BACKEND_URL}/check-duplicate-ids", params=params, auth=get_auth())
     resp.raise_for_status()
     return resp.json().get("existing_ids", [])
 
 def fetch_orders_from_api(start_date, end_date):
     params = {"start_date": start_date, "end_date": end_date}
-    resp = requests.get(f"{BACKEND_URL}/orders", params=params, auth=get_auth())
+    resp = get_api_client().get(f"{BACKEND_URL}/orders", params=params, auth=get_auth())
     resp.raise_for_status()
-    return sanitize_df(pd.DataFrame(resp.json()))
+    return sanitize_df(pd.DataFrame(orjson.loads(resp.content)))
 
 def search_shopify_orders_api(query):
     params = {"q": query}
-    resp = requests.get(f"{BACKEND_URL}/shopify/search", params=params, auth=get_auth())
+    resp = get_api_client().get(f"{BACKEND_URL}/shopify/search", params=params, auth=get_auth())
     resp.raise_for_status()
-    return sanitize_df(pd.DataFrame(resp.json()))
-
-def process_transformations_api(df):
-    resp = requests.post(f"{BACKEND_URL}/process-transformations", json=df.to_dict(orient="records"), auth=get_auth())
+    return sanitize_df(pd.DataFrame(orjson.loads(resp.content)))
+
+def process_transformations_api(df, annotate_existing=False):
+    params = {"annotate_existing": annotate_existing}
+    resp = get_api_client().post(
+        f"{BACKEND_URL}/process-transformations",
+        params=params,
+        data=orjson.dumps(df.to_dict(orient="records"), option=orjson.OPT_SERIALIZE_NUMPY),
+        headers={"Content-Type": "application/json"},
+        auth=get_auth()
+    )
     resp.raise_for_status()
-    result = resp.json()
+    result = orjson.loads(resp.content)
     return sanitize_df(pd.DataFrame(result["processed"])), sanitize_df(pd.DataFrame(result["master"]))
 
 def load_sellers_api():
     try:
-        resp = requests.get(f"{BACKEND_URL}/sellers", auth=get_auth())
+        resp = get_api_client().get(f"{BACKEND_URL}/sellers", auth=get_auth())
         resp.raise_for_status()
         return pd.DataFrame(resp.json())
     except Exception as e:
@@ -73,13 +124,13 @@ def load_sellers_api():
         return pd.DataFrame(columns=['SELLER CODE', 'SELLER NAME', 'WEB_ADDRESS_EXTENSION'])
 
 def get_order_details(order_id):
-    resp = requests.get(f"{BACKEND_URL}/order/{order_id}", auth=get_auth())
+    resp = get_api_client().get(f"{BACKEND_URL}/order/{order_id}", auth=get_auth())
     resp.raise_for_status()
     return resp.json()
 
 def update_skip_api(order_id, skip_date, sku=None, table_name="historical-data"):
     payload = {"order_id": str(order_id), "skip_date": skip_date, "sku": sku}
-    resp = requests.post(f"{BACKEND_URL}/skip-order", params={"table_name": table_name}, json=payload, auth=get_auth())
+    resp = get_api_client().post(f"{BACKEND_URL}/skip-order", params={"table_name": table_name}, json=payload, auth=get_auth())
     if resp.status_code != 200:
         raise Exception(resp.json().get('detail', 'Unknown error'))
     return resp.json()
@@ -92,18 +143,24 @@ def update_manual_fields_api(order_id, tl_notes, skus, sku=None, extra_filters=N
         "sku": sku,
         "filters": extra_filters
     }
-    resp = requests.post(f"{BACKEND_URL}/update-order", json=payload, auth=get_auth())
+    resp = get_api_client().post(f"{BACKEND_URL}/update-order", json=payload, auth=get_auth())
     resp.raise_for_status()
     return resp.json()
 
-def upload_master_data_api(data, table_name="historical-data"):
-    # Clean each row in the list
-    cleaned_data = [clean_dict(row) for row in data]
-    payload = {
-        "table_name": table_name,
-        "data": cleaned_data
-    }
-    resp = requests.post(f"{BACKEND_URL}/upload-master-data", json=payload, auth=get_auth())
+def upload_master_data_api(data, table_name="historical-data", auth=None, session=None):
+    # auth and session can be passed in explicitly when called from a worker thread,
+    # where st.session_state and st.cache_resource are not available
+    # data is a DataFrame or a list of row dicts; either way it is cleaned and
+    # serialized in one vectorized pass rather than row by row
+    records = records_to_json(data if isinstance(data, pd.DataFrame) else pd.DataFrame(data, dtype=object))
+    body = f'{{"table_name": {json.dumps(table_name)}, "data": {records}}}'
+    # Stringified rows compress well; level 1 keeps the CPU cost negligible
+    resp = (session or get_api_client()).post(
+        f"{BACKEND_URL}/upload-master-data",
+        data=gzip.compress(body.encode("utf-8"), compresslevel=1),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        auth=auth or get_auth()
+    )
     resp.raise_for_status()
     return resp.json()
 
@@ -114,7 +171,24 @@ def update_master_row_api(order_id, updates, original_row, table_name="historica
         "updates": clean_dict(updates),
         "original_row": clean_dict(original_row)
     }
-    resp = requests.post(f"{BACKEND_URL}/update-master-row", json=payload, auth=get_auth())
+    resp = get_api_client().post(f"{BACKEND_URL}/update-master-row", json=payload, auth=get_auth())
+    resp.raise_for_status()
+    return resp.json()
+
+def update_master_rows_bulk_api(rows, table_name="historical-data"):
+    """rows: list of {"order_id", "updates", "original_row"} dicts, sent in one request."""
+    payload = {
+        "table_name": table_name,
+        "rows": [
+            {
+                "order_id": str(r["order_id"]),
+                "updates": clean_dict(r["updates"]),
+                "original_row": clean_dict(r["original_row"])
+            }
+            for r in rows
+        ]
+    }
+    resp = get_api_client().post(f"{BACKEND_URL}/update-master-rows", json=payload, auth=get_auth())
     resp.raise_for_status()
     return resp.json()
 
@@ -124,7 +198,7 @@ def delete_master_row_api(order_id, original_row, table_name="historical-data"):
         "order_id": str(order_id), 
         "original_row": clean_dict(original_row)
     }
-    resp = requests.post(f"{BACKEND_URL}/remove-master-record", json=payload, auth=get_auth())
+    resp = get_api_client().post(f"{BACKEND_URL}/remove-master-record", json=payload, auth=get_auth())
     resp.raise_for_status()
     return resp.json()
 
@@ -132,31 +206,36 @@ def final_pivot_df(df, delivery_time):
     if df.empty:
         return pd.DataFrame()
         
-    df_clean = df.copy()
-    if "DELIVERY TIME" not in df_clean.columns and "DELIVERY_TIME" in df_clean.columns:
-        df_clean = df_clean.rename(columns={"DELIVERY_TIME": "DELIVERY TIME"})
-        
-    if "DELIVERY TIME" not in df_clean.columns:
+    time_col = "DELIVERY TIME" if "DELIVERY TIME" in df.columns else "DELIVERY_TIME"
+    if time_col not in df.columns:
         return pd.DataFrame()
         
-    # Standardize types and strings
-    df_clean["DELIVERY TIME"] = df_clean["DELIVERY TIME"].astype(str).str.strip().str.upper()
+    # Standardize types and strings (on the one column, not a copy of the frame);
+    # string columns (e.g. Arrow-backed) are kept as-is rather than cast to object
+    delivery = df[time_col]
+    if not isinstance(delivery.dtype, pd.StringDtype):
+        delivery = delivery.astype(str)
+    delivery = delivery.str.strip().str.upper()
     target = str(delivery_time).strip().upper()
     
-    # Filter
-    filtered_df = df_clean[df_clean["DELIVERY TIME"] == target].copy()
+    # Include Description, Seller Note, and Label in grouping
+    group_cols = ['PRODUCT', 'MEAL PLAN', 'DESCRIPTION', 'SELLER NOTE', 'LABEL']
+    group_cols = [c for c in group_cols if c in df.columns]
+    
+    # Filter, copying only the columns the pivot needs
+    filtered_df = df.loc[(delivery == target).to_numpy(dtype=bool, na_value=False), group_cols + ['QUANTITY']]
     if filtered_df.empty:
         return pd.DataFrame()
         
     # Convert Quantity to numeric
-    filtered_df['QUANTITY'] = pd.to_numeric(filtered_df['QUANTITY'], errors='coerce').fillna(0)
-    
-    # Include Description, Seller Note, and Label in grouping
-    group_cols = ['PRODUCT', 'MEAL PLAN', 'DESCRIPTION', 'SELLER NOTE', 'LABEL']
-    group_cols = [c for c in group_cols if c in filtered_df.columns]
+    # Group keys as categories so grouping works on integer codes
+    filtered_df = filtered_df.assign(
+        QUANTITY=pd.to_numeric(filtered_df['QUANTITY'], errors='coerce').fillna(0),
+        **{c: filtered_df[c].astype('category') for c in group_cols}
+    )
     
-    # Group and Sum
-    pivot_df = filtered_df.groupby(group_cols, as_index=False)["QUANTITY"].sum()
+    # Group and Sum (observed=True: only combinations that actually occur)
+    pivot_df = filtered_df.groupby(group_cols, as_index=False, observed=True)["QUANTITY"].sum()
     
     # Final cleanup: ensure we only return the grouped columns and the sum
     final_cols = group_cols + ["QUANTITY"]
@@ -4,10 +4,10 @@ Handles OAuth flow and session management.
 """
 import os
 import json
+import requests
 import streamlit as st
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,35 +21,40 @@ SCOPES = [
 
 # Allowed domain for SSO
 ALLOWED_DOMAIN = os.getenv("ALLOWED_SSO_DOMAIN", "tiffinstash.com")
+_ALLOWED_SUFFIX = "@" + ALLOWED_DOMAIN.lower()
 
 # OAuth credentials
 CLIENT_ID = os.getenv("GOOGLE_OAUTH_CLIENT_ID")
 CLIENT_SECRET = os.getenv("GOOGLE_OAUTH_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("GOOGLE_OAUTH_REDIRECT_URI", "http://localhost:8501")
 
+USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+# Client config is fixed for the process, so it is built once at import
+_CLIENT_CONFIG = {
+    "web": {
+        "client_id": CLIENT_ID,
+        "client_secret": CLIENT_SECRET,
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "redirect_uris": [REDIRECT_URI]
+    }
+} if CLIENT_ID and CLIENT_SECRET else None
+
 
 def get_oauth_flow():
     """
     Create and return a Google OAuth Flow object.
     """
-    if not CLIENT_ID or not CLIENT_SECRET:
+    if _CLIENT_CONFIG is None:
         raise ValueError(
             "Missing OAuth credentials. Please set GOOGLE_OAUTH_CLIENT_ID and "
             "GOOGLE_OAUTH_CLIENT_SECRET environment variables."
         )
     
-    client_config = {
-        "web": {
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "redirect_uris": [REDIRECT_URI]
-        }
-    }
-    
+    # A new Flow each time: it holds per-login state and the fetched credentials
     flow = Flow.from_client_config(
-        client_config,
+        _CLIENT_CONFIG,
         scopes=SCOPES,
         redirect_uri=REDIRECT_URI
     )
@@ -108,8 +113,7 @@ def exchange_code_for_token(code, state):
         if user_info:
             # Validate domain (case-insensitive)
             email = user_info.get('email', '').lower()
-            allowed_domain = ALLOWED_DOMAIN.lower()
-            if not email.endswith(f"@{allowed_domain}"):
+            if not email.endswith(_ALLOWED_SUFFIX):
                 logger.warning(f"Login attempt from unauthorized domain: {email}")
                 return None
             
@@ -129,10 +133,21 @@ def exchange_code_for_token(code, state):
         return None
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_user_info(token):
+    """Userinfo for an access token, cached for the token's lifetime (errors are not cached)."""
+    resp = requests.get(USERINFO_URL, headers={"Authorization": f"Bearer {token}"}, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
 def get_user_info(credentials):
     """
     Get user information from Google using OAuth credentials.
     
+    Calls the userinfo endpoint directly rather than building a discovery
+    client, which fetches and parses the API's discovery document first.
+    
     Args:
         credentials: Google OAuth credentials
         
@@ -140,9 +155,7 @@ def get_user_info(credentials):
         dict: User information
     """
     try:
-        service = build('oauth2', 'v2', credentials=credentials)
-        user_info = service.userinfo().get().execute()
-        return user_info
+        return _fetch_user_info(credentials.token)
     except Exception as e:
         logger.error(f"Error getting user info: {e}")
         return None